@@ -2,9 +2,12 @@
 
 import os
 import shlex
+import shutil
+import sys
 from pathlib import Path
 from textwrap import dedent
 from typing import List
+from typing import Optional
 
 import nox
 from nox.command import CommandFailed
@@ -21,9 +24,11 @@ PYTHON_VERSIONS: List[str] = [
     f"3.{VERSION_SLUG}" for VERSION_SLUG in range(MIN_PYTHON_VERSION_SLUG, MAX_PYTHON_VERSION_SLUG + 1)
 ]
 DEFAULT_PYTHON_VERSION: str = PYTHON_VERSIONS[-1]
+FREE_THREADED_PYTHON_VERSION: str = f"{DEFAULT_PYTHON_VERSION}t"
 
 REPO_ROOT: Path = Path(__file__).parent.resolve()
 TESTS_FOLDER: Path = REPO_ROOT / "tests"
+BENCHMARKS_FOLDER: Path = TESTS_FOLDER / "benchmark_tests"
 SCRIPTS_FOLDER: Path = REPO_ROOT / "scripts"
 CRATES_FOLDER: Path = REPO_ROOT / "rust"
 
@@ -37,6 +42,7 @@ FORMAT: str = "format"
 LINT: str = "lint"
 TYPE: str = "type"
 TEST: str = "test"
+BENCHMARK: str = "benchmark"
 COVERAGE: str = "coverage"
 SECURITY: str = "security"
 DOCS: str = "docs"
@@ -44,6 +50,17 @@ BUILD: str = "build"
 RELEASE: str = "release"
 QUALITY: str = "quality"
 
+# Quality sessions and the sessions that have to pass before each can start. Sessions that may rewrite
+# files (format-python, lint-python and the pre-commit hooks) run one after another, and sessions that
+# only read files wait until all of those have finished.
+QUALITY_SESSION_GRAPH: dict[str, list[str]] = {
+    "format-python": [],
+    "lint-python": ["format-python"],
+    "pre-commit": ["lint-python"],
+    "security-python": ["pre-commit"],
+    **{f"typecheck-{python_version}": ["pre-commit"] for python_version in PYTHON_VERSIONS},
+}
+
 
 @nox.session(python=False, name="setup-git", tags=[ENV])
 def setup_git(session: Session) -> None:
@@ -109,6 +126,33 @@ def typecheck(session: Session) -> None:
     session.run("pyright", "--pythonversion", session.python)
 
 
+@nox.session(python=DEFAULT_PYTHON_VERSION, name="typecheck-matrix")
+def typecheck_matrix(session: Session) -> None:
+    """Run Pyright against every supported Python version from one shared environment.
+
+    The project is installed once and each version is checked concurrently against it, reporting shared
+    diagnostics once. Pass `-- --changed [REF]` to only check Python files changed since REF (default
+    HEAD) and the files that directly import them, or `-- --watch` to keep one warm, incrementally
+    rechecking Pyright per version running. --changed misses errors that only reach a file through a
+    module it imports indirectly, so run the full check before pushing.
+    """
+    session.log("Installing type checking dependencies...")
+    session.install("-e", ".", "--group", "dev")
+
+    python_path: Optional[str] = session.run("python", "-c", "import sys; print(sys.executable)", silent=True)
+    pythonpath: list[str] = [f"--pythonpath={python_path.strip()}"] if python_path else []
+    python_versions: list[str] = [f"--python-version={python_version}" for python_version in PYTHON_VERSIONS]
+
+    session.log(f"Running Pyright check for py{', py'.join(PYTHON_VERSIONS)} with py{session.python}.")
+    session.run(
+        "python",
+        SCRIPTS_FOLDER / "run-pyright-matrix.py",
+        *python_versions,
+        *pythonpath,
+        *session.posargs,
+    )
+
+
 @nox.session(python=False, name="security-python", tags=[SECURITY])
 def security_python(session: Session) -> None:
     """Run code security checks (Bandit) on Python code."""
@@ -119,9 +163,27 @@ def security_python(session: Session) -> None:
     session.run("uvx", "pip-audit")
 
 
+@nox.session(python=False, name="quality-parallel")
+def quality_parallel(session: Session) -> None:
+    """Run the quality, type checking and security sessions concurrently, in dependency order.
+
+    Each session runs in its own nox process once the sessions it depends on have passed, and its output
+    is printed in one block when it finishes. Options after `--` are passed through to each nox process,
+    except `--jobs=N`, which limits how many sessions run at once.
+    """
+    graph: list[str] = [f"{name}:{','.join(dependencies)}" for name, dependencies in QUALITY_SESSION_GRAPH.items()]
+    session.run(sys.executable, SCRIPTS_FOLDER / "run-session-graph.py", *graph, *session.posargs, external=True)
+
+
 @nox.session(python=PYTHON_VERSIONS, name="tests-python", tags=[TEST])
 def tests_python(session: Session) -> None:
-    """Run the Python test suite (pytest with coverage)."""
+    """Run the Python test suite (pytest with coverage), sharded across one pytest process per CPU.
+
+    Shards are balanced using test durations from earlier junit reports in tests/results. Arguments
+    after `--` are passed to pytest verbatim and in order, e.g. `-- -k formats` or `-- tests/unit_tests`.
+    Any paths given replace the default `tests/`. The one exception is `--shards=N`, which sets the
+    number of shards.
+    """
     session.log("Installing test dependencies...")
     session.install("-e", ".", "--group", "dev")
 
@@ -131,13 +193,65 @@ def tests_python(session: Session) -> None:
     junitxml_file = test_results_dir / f"test-results-py{session.python.replace('.', '')}.xml"
 
     session.run(
-        "pytest",
-        "--cov={}".format(PACKAGE_NAME),
-        "--cov-append",
-        "--cov-report=term",
-        "--cov-report=xml",
+        "python",
+        SCRIPTS_FOLDER / "run-sharded-tests.py",
+        f"--cov={PACKAGE_NAME}",
+        f"--results-dir={test_results_dir}",
         f"--junitxml={junitxml_file}",
+        f"--ignore={BENCHMARKS_FOLDER}",
+        "--override-ini=testpaths=tests",
+        *session.posargs,
+    )
+    session.run("coverage", "report")
+    session.run("coverage", "xml")
+
+
+@nox.session(python=PYTHON_VERSIONS, name="benchmark-python", tags=[BENCHMARK])
+def benchmark_python(session: Session) -> None:
+    """Run the Python benchmark suite (pytest, reporting throughput)."""
+    session.log("Installing benchmark dependencies...")
+    session.install("-e", ".", "--group", "dev")
+
+    session.log(f"Running benchmarks with py{session.python}.")
+    benchmark_results_dir = TESTS_FOLDER / "results"
+    benchmark_results_dir.mkdir(parents=True, exist_ok=True)
+    junitxml_file = benchmark_results_dir / f"benchmark-results-py{session.python.replace('.', '')}.xml"
+
+    session.run("pytest", f"--junitxml={junitxml_file}", str(BENCHMARKS_FOLDER), *session.posargs)
+
+
+@nox.session(python=FREE_THREADED_PYTHON_VERSION, name="free-threaded-python", tags=[TEST, BENCHMARK])
+def free_threaded_python(session: Session) -> None:
+    """Run the test and benchmark suites on a free-threaded (no GIL) Python build.
+
+    PYTHON_GIL=0 keeps the GIL disabled even if an extension module doesn't declare free-threading support,
+    so the thread pool backend and its thread-safety are exercised for real.
+    """
+    session.log("Installing test dependencies...")
+    session.install("-e", ".", "--group", "dev")
+
+    env: dict[str, str] = {"PYTHON_GIL": "0"}
+    session.run("python", "-c", "import sys; assert not sys._is_gil_enabled(), 'The GIL is enabled.'", env=env)
+
+    test_results_dir = TESTS_FOLDER / "results"
+    test_results_dir.mkdir(parents=True, exist_ok=True)
+    python_slug: str = session.python.replace(".", "")
+
+    session.log(f"Running test suite with py{session.python}.")
+    session.run(
+        "pytest",
+        f"--junitxml={test_results_dir / f'test-results-py{python_slug}.xml'}",
+        f"--ignore={BENCHMARKS_FOLDER}",
         "tests/",
+        env=env,
+    )
+
+    session.log(f"Running benchmarks with py{session.python}.")
+    session.run(
+        "pytest",
+        f"--junitxml={test_results_dir / f'benchmark-results-py{python_slug}.xml'}",
+        str(BENCHMARKS_FOLDER),
+        env=env,
     )
 
 
@@ -167,6 +281,64 @@ def build_python(session: Session) -> None:
         session.log(f"- {path.name}")
 
 
+@nox.session(python=DEFAULT_PYTHON_VERSION, name="build-zipapp", tags=[BUILD])
+def build_zipapp(session: Session) -> None:
+    """Build a single-file executable zipapp of the CLI and its runtime dependencies."""
+    zipapp_file: Path = _build_zipapp(session)
+    session.log(f"Built zipapp at {zipapp_file}.")
+
+
+@nox.session(python=DEFAULT_PYTHON_VERSION, name="benchmark-zipapp", tags=[BENCHMARK, BUILD])
+def benchmark_zipapp(session: Session) -> None:
+    """Compare the startup time of the zipapp against a regular wheel install.
+
+    The read-only case points Python at an empty bytecode cache it can't write to, like an install
+    baked into a read-only container image without precompiled bytecode.
+    """
+    zipapp_file: Path = _build_zipapp(session)
+    empty_pycache_dir: Path = Path(session.create_tmp()) / "empty-pycache"
+
+    session.log("Installing the wheel to compare against...")
+    session.install(".")
+
+    session.log(f"Benchmarking startup with py{session.python}.")
+    session.run(
+        "python",
+        SCRIPTS_FOLDER / "benchmark-startup.py",
+        f"wheel={PROJECT_NAME}",
+        f"wheel-read-only={PROJECT_NAME}",
+        f"zipapp=python {zipapp_file}",
+        "--env",
+        "wheel-read-only:PYTHONDONTWRITEBYTECODE=1",
+        "--env",
+        f"wheel-read-only:PYTHONPYCACHEPREFIX={empty_pycache_dir}",
+        *session.posargs,
+    )
+
+
+def _build_zipapp(session: Session) -> Path:
+    """Installs the package and its dependencies into a staging directory and packages it as a zipapp."""
+    staging_dir: Path = Path(session.create_tmp()) / "zipapp"
+    if staging_dir.exists():
+        shutil.rmtree(staging_dir)
+
+    session.log("Staging the package and its runtime dependencies...")
+    session.install(".", "--target", str(staging_dir), "--no-compile")
+
+    zipapp_file: Path = Path("dist") / f"{PROJECT_NAME}.pyz"
+    session.log(f"Building zipapp with py{session.python}.")
+    session.run(
+        "python",
+        SCRIPTS_FOLDER / "build-zipapp.py",
+        staging_dir,
+        "--output",
+        zipapp_file,
+        "--interpreter",
+        f"/usr/bin/env python{session.python}",
+    )
+    return zipapp_file
+
+
 @nox.session(python=False, name="build-container", tags=[BUILD])
 def build_container(session: Session) -> None:
     """Build the Docker container image.
@@ -0,0 +1,114 @@
+"""Script responsible for comparing CLI startup time across ways of installing it.
+
+Each command is run repeatedly with empty stdin, so the time measured is almost entirely interpreter
+startup, imports and argument parsing.
+
+Since this is a benchmark script, we intentionally only use builtin Python dependencies.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import time
+from typing import Optional
+
+
+def main() -> None:
+    """Parses command line input and passes it through to benchmark_startup."""
+    parser: argparse.ArgumentParser = get_parser()
+    args: argparse.Namespace = parser.parse_args()
+    commands: dict[str, list[str]] = dict(args.command)
+    env_overrides: dict[str, dict[str, str]] = {}
+    for label, override in args.env:
+        env_overrides.setdefault(label, {}).update(override)
+    benchmark_startup(commands=commands, rounds=args.rounds, env_overrides=env_overrides)
+
+
+def benchmark_startup(
+    commands: dict[str, list[str]], rounds: int = 20, env_overrides: Optional[dict[str, dict[str, str]]] = None
+) -> dict[str, list[float]]:
+    """Times each command's startup and prints a table of the results.
+
+    Every command is run once before timing starts so caches, such as bytecode written next to an
+    installed package, are warm. Rounds are interleaved between commands so background noise is spread
+    evenly across them.
+    """
+    env_overrides = env_overrides or {}
+    timings: dict[str, list[float]] = {label: [] for label in commands}
+    for label, command in commands.items():
+        time_command(command, env=get_env(env_overrides.get(label)))
+    for _ in range(rounds):
+        for label, command in commands.items():
+            timings[label].append(time_command(command, env=get_env(env_overrides.get(label))))
+
+    width: int = max(len(label) for label in commands)
+    baseline: float = statistics.median(next(iter(timings.values())))
+    print(f"{'command':<{width}}  {'min (ms)':>9}  {'median (ms)':>11}  {'relative':>8}")
+    for label, samples in timings.items():
+        median: float = statistics.median(samples)
+        print(f"{label:<{width}}  {min(samples) * 1e3:>9.1f}  {median * 1e3:>11.1f}  {median / baseline:>7.2f}x")
+    return timings
+
+
+def time_command(command: list[str], env: dict[str, str]) -> float:
+    """Runs the command once with empty stdin and returns its wall clock time in seconds."""
+    start: float = time.perf_counter()
+    subprocess.run(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, env=env, check=True)
+    return time.perf_counter() - start
+
+
+def get_env(overrides: Optional[dict[str, str]]) -> dict[str, str]:
+    """Returns a copy of the current environment with the overrides applied."""
+    return {**os.environ, **(overrides or {})}
+
+
+def parse_command(value: str) -> tuple[str, list[str]]:
+    """Parses a LABEL=COMMAND argument into its label and whitespace separated command."""
+    label, separator, command = value.partition("=")
+    if not separator or not command.split():
+        raise argparse.ArgumentTypeError(f"Expected LABEL=COMMAND, got {value!r}.")
+    return label, command.split()
+
+
+def parse_env(value: str) -> tuple[str, dict[str, str]]:
+    """Parses a LABEL:NAME=VALUE argument into its label and environment override."""
+    label, separator, assignment = value.partition(":")
+    name, equals, env_value = assignment.partition("=")
+    if not separator or not equals:
+        raise argparse.ArgumentTypeError(f"Expected LABEL:NAME=VALUE, got {value!r}.")
+    return label, {name: env_value}
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """Creates the argument parser for benchmark-startup."""
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="benchmark-startup",
+        usage=(
+            "python ./scripts/benchmark-startup.py "
+            "'wheel=robust-python-demo' 'zipapp=python dist/robust-python-demo.pyz'"
+        ),
+        description="Compare CLI startup time between commands. The first command is the baseline.",
+    )
+    parser.add_argument(
+        "command",
+        type=parse_command,
+        nargs="+",
+        metavar="LABEL=COMMAND",
+        help="Command to time, labelled for the results table.",
+    )
+    parser.add_argument("-n", "--rounds", type=int, default=20, help="Number of timed runs of each command.")
+    parser.add_argument(
+        "-e",
+        "--env",
+        type=parse_env,
+        action="append",
+        default=[],
+        metavar="LABEL:NAME=VALUE",
+        help="Environment variable to set when running the labelled command.",
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    main()
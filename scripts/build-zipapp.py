@@ -0,0 +1,219 @@
+"""Script responsible for packaging the CLI and its runtime dependencies into a single zipapp.
+
+The staging directory is expected to already contain the package and its dependencies, for example from
+`uv pip install . --target <staging>`. Every module is precompiled to bytecode ahead of time and an
+import index is written into the archive's entry point, so startup never compiles source or searches
+sys.path for the CLI's modules. Extension modules can't be imported from inside a zip, so they are
+extracted to a cache directory the first time they are imported.
+
+Since this is a build script, we intentionally only use builtin Python dependencies.
+"""
+
+import argparse
+import hashlib
+import importlib.machinery
+import importlib.util
+import marshal
+import stat
+import sys
+import zipfile
+from pathlib import Path
+from typing import Optional
+
+from util import existing_dir
+
+
+BOOTSTRAP_TEMPLATE: str = '''\
+"""Entry point of the robust-python-demo zipapp. Generated by scripts/build-zipapp.py."""
+
+import os
+import sys
+import zipimport
+from importlib.machinery import ExtensionFileLoader
+from importlib.machinery import ModuleSpec
+
+
+ARCHIVE = os.path.dirname(__file__)
+BUILD_ID = {build_id!r}
+MODULES = frozenset({modules!r})
+NATIVE_MODULES = {native_modules!r}
+
+
+class ArchiveFinder:
+    """Finds the archive's modules from the build-time index instead of searching sys.path."""
+
+    def __init__(self):
+        self.importers = {{}}
+
+    def find_spec(self, fullname, path=None, target=None):
+        if fullname in NATIVE_MODULES:
+            location = extract(NATIVE_MODULES[fullname])
+            return ModuleSpec(fullname, ExtensionFileLoader(fullname, location), origin=location)
+        if fullname not in MODULES:
+            return None
+        prefix = fullname.rpartition(".")[0].replace(".", "/")
+        importer = self.importers.get(prefix)
+        if importer is None:
+            importer = self.importers[prefix] = zipimport.zipimporter(os.path.join(ARCHIVE, prefix))
+        return importer.find_spec(fullname, target)
+
+
+def extract(member):
+    """Extracts a member to the cache directory, once per build, returning its path on disk."""
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    location = os.path.join(cache, "robust-python-demo", "zipapp", BUILD_ID, *member.split("/"))
+    if not os.path.exists(location):
+        import tempfile
+        import zipfile
+
+        os.makedirs(os.path.dirname(location), exist_ok=True)
+        with zipfile.ZipFile(ARCHIVE) as archive:
+            data = archive.read(member)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(location))
+        with os.fdopen(fd, "wb") as temp_file:
+            temp_file.write(data)
+        os.chmod(temp_path, 0o755)
+        os.replace(temp_path, location)
+    return location
+
+
+if hasattr(zipimport.zipimporter, "find_spec"):
+    sys.meta_path.insert(0, ArchiveFinder())
+
+from robust_python_demo.__main__ import app  # noqa: E402
+
+app(prog_name="robust-python-demo")
+'''
+
+EXCLUDED_DIRS: frozenset[str] = frozenset({"__pycache__", "bin"})
+
+
+def main() -> None:
+    """Parses command line input and passes it through to build_zipapp."""
+    parser: argparse.ArgumentParser = get_parser()
+    args: argparse.Namespace = parser.parse_args()
+    build_zipapp(staging=args.staging, output=args.output, interpreter=args.interpreter, compress=args.compress)
+
+
+def build_zipapp(staging: Path, output: Path, interpreter: Optional[str] = None, compress: bool = False) -> None:
+    """Builds an executable zipapp from the staged package and dependencies."""
+    members: dict[str, bytes] = {}
+    modules: set[str] = set()
+    native_modules: dict[str, str] = {}
+
+    for source in sorted(staging.rglob("*")):
+        relative: Path = source.relative_to(staging)
+        if not source.is_file() or EXCLUDED_DIRS.intersection(relative.parts[:-1]):
+            continue
+        if source.suffix == ".pyc" or relative.parts == ("__main__.py",):
+            continue
+
+        module: Optional[str] = get_module_name(relative)
+        if source.suffix == ".py":
+            compiled: Optional[bytes] = compile_source(source)
+            if compiled is not None:
+                members[relative.with_suffix(".pyc").as_posix()] = compiled
+                if module is not None:
+                    modules.add(module)
+                continue
+        elif module is not None and is_extension_module(relative):
+            native_modules[module] = relative.as_posix()
+        members[relative.as_posix()] = source.read_bytes()
+
+    build_id: str = hashlib.sha256(b"".join(name.encode() + data for name, data in sorted(members.items()))).hexdigest()
+    bootstrap: str = BOOTSTRAP_TEMPLATE.format(
+        build_id=build_id[:16], modules=sorted(modules), native_modules=dict(sorted(native_modules.items()))
+    )
+    members["__main__.pyc"] = compile_text(bootstrap, "__main__.py")
+
+    write_archive(output=output, members=members, interpreter=interpreter, compress=compress)
+    print(
+        f"Built {output} ({output.stat().st_size / 1e6:.1f} MB, {len(modules)} modules, {len(native_modules)} native)."
+    )
+
+
+def get_module_name(relative: Path) -> Optional[str]:
+    """Returns the dotted module name for a file in the staging directory, if it is importable."""
+    parts: list[str] = list(relative.parts)
+    name: str = parts[-1]
+    if name.endswith(".py"):
+        parts[-1] = name[: -len(".py")]
+    else:
+        suffix: Optional[str] = next((s for s in importlib.machinery.EXTENSION_SUFFIXES if name.endswith(s)), None)
+        if suffix is None:
+            return None
+        parts[-1] = name[: -len(suffix)]
+    if parts[-1] == "__init__":
+        parts.pop()
+    if not parts or not all(part.isidentifier() for part in parts):
+        return None
+    return ".".join(parts)
+
+
+def is_extension_module(relative: Path) -> bool:
+    """Whether the file is a native extension module for this interpreter."""
+    return any(relative.name.endswith(suffix) for suffix in importlib.machinery.EXTENSION_SUFFIXES)
+
+
+def compile_source(source: Path) -> Optional[bytes]:
+    """Compiles a source file to bytecode, returning None if it doesn't compile on this interpreter."""
+    try:
+        return compile_text(source.read_text(encoding="utf-8"), source.as_posix())
+    except (SyntaxError, UnicodeDecodeError, ValueError) as e:
+        print(f"Keeping {source} as source, it failed to compile: {e}")
+        return None
+
+
+def compile_text(text: str, filename: str) -> bytes:
+    """Compiles source text into the bytes of an unchecked-hash .pyc file.
+
+    Bytecode is compiled with optimization level 1, which drops asserts but keeps the docstrings Typer
+    uses for help text. Unchecked-hash pycs are never validated against a source file at import time.
+    """
+    code = compile(text, filename, "exec", dont_inherit=True, optimize=1)
+    source_hash: bytes = importlib.util.source_hash(text.encode("utf-8"))
+    return importlib.util.MAGIC_NUMBER + (0b01).to_bytes(4, "little") + source_hash + marshal.dumps(code)
+
+
+def write_archive(output: Path, members: dict[str, bytes], interpreter: Optional[str], compress: bool) -> None:
+    """Writes the shebang line and zip members to the output file and marks it executable."""
+    output.parent.mkdir(parents=True, exist_ok=True)
+    compression: int = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    with output.open("wb") as stream:
+        if interpreter:
+            stream.write(b"#!" + interpreter.encode(sys.getfilesystemencoding()) + b"\n")
+        with zipfile.ZipFile(stream, "w", compression=compression) as archive:
+            for name, data in members.items():
+                archive.writestr(zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0)), data)
+    if interpreter:
+        output.chmod(output.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """Creates the argument parser for build-zipapp."""
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="build-zipapp",
+        usage="python ./scripts/build-zipapp.py build/zipapp -o dist/robust-python-demo.pyz",
+        description="Package a staged install of robust-python-demo into a single executable zipapp.",
+    )
+    parser.add_argument(
+        "staging",
+        type=existing_dir,
+        metavar="STAGING",
+        help="Directory the package and its runtime dependencies were installed into with --target.",
+    )
+    parser.add_argument("-o", "--output", type=Path, required=True, help="Path to write the zipapp to.")
+    parser.add_argument(
+        "-p",
+        "--interpreter",
+        default=f"/usr/bin/env python{sys.version_info.major}.{sys.version_info.minor}",
+        help="Interpreter for the shebang line. Must match the Python version that compiled the bytecode.",
+    )
+    parser.add_argument(
+        "--compress", action="store_true", help="Deflate archive members. Smaller, but slower to start."
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""Pytest plugin used by run-sharded-tests.py to run only the tests assigned to one shard.
+
+Each shard runs pytest with exactly the arguments the tests were collected with and loads this plugin
+with `-p pytest_shard`. Every collected test whose node id isn't listed in the file named by the
+PYTEST_SHARD_FILE environment variable is deselected.
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+
+SHARD_FILE_VARIABLE: str = "PYTEST_SHARD_FILE"
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    """Deselects the collected tests that were assigned to other shards."""
+    node_ids: set[str] = set(Path(os.environ[SHARD_FILE_VARIABLE]).read_text(encoding="utf-8").splitlines())
+    config.hook.pytest_deselected(items=[item for item in items if item.nodeid not in node_ids])
+    items[:] = [item for item in items if item.nodeid in node_ids]
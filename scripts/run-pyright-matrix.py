@@ -0,0 +1,304 @@
+"""Script responsible for type checking against every supported Python version from a single environment.
+
+Rather than installing the project into one environment per Python version and running a cold pyright
+in each, every version is checked against the same interpreter's installed packages, with pyright's
+--pythonversion picking which version's typeshed stubs and version checks apply. The checks for each
+version run concurrently and their diagnostics are merged, so an issue affecting every version is only
+reported once.
+
+Pyright fixes the Python version for the whole program it analyzes, so a single process can't check
+more than one version. In --watch mode one warm pyright process per version is kept running, each
+rechecking only what changed from its cached program state. With --changed, only the Python files that
+differ from a git ref are checked, which keeps a small local edit to a few seconds across the matrix.
+Files that directly import a changed module are checked too, since a changed signature usually breaks
+its callers. Files that only depend on a changed module through another module aren't, so run the full
+check before pushing.
+
+Since this script is run by nox, we intentionally only use builtin Python dependencies.
+"""
+
+import argparse
+import ast
+import json
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from typing import Optional
+from typing import TextIO
+
+
+PYTHON_SUFFIXES: tuple[str, ...] = (".py", ".pyi")
+
+
+@dataclass
+class PyrightRun:
+    """The outcome of checking a single Python version."""
+
+    python_version: str
+    returncode: int
+    summary: dict[str, object] = field(default_factory=dict)
+    diagnostics: list[dict] = field(default_factory=list)
+
+
+def main() -> None:
+    """Parses command line input and passes it through to run_pyright_matrix or watch_pyright_matrix."""
+    parser: argparse.ArgumentParser = get_parser()
+    args: argparse.Namespace = parser.parse_args()
+
+    pyright: Optional[str] = shutil.which("pyright")
+    if pyright is None:
+        parser.error("pyright was not found on PATH.")
+    options: list[str] = [f"--project={args.project}"]
+    if args.pythonpath is not None:
+        options.append(f"--pythonpath={args.pythonpath}")
+
+    files: list[str] = args.files
+    if args.changed is not None:
+        include: list[Path] = get_included_paths(args.project)
+        files = get_changed_files(ref=args.changed, include=include)
+        if not files:
+            print(f"No Python files changed since {args.changed}.")
+            return
+        importers: list[str] = get_importing_files(files=files, include=include)
+        print(f"Checking {len(files)} changed files and {len(importers)} files importing them.")
+        files = sorted([*files, *importers])
+
+    if args.watch:
+        watch_pyright_matrix(pyright=pyright, python_versions=args.python_versions, options=[*options, *files])
+        return
+    sys.exit(run_pyright_matrix(pyright=pyright, python_versions=args.python_versions, options=[*options, *files]))
+
+
+def run_pyright_matrix(pyright: str, python_versions: list[str], options: list[str]) -> int:
+    """Checks every Python version at once, prints the merged diagnostics and returns the worst exit code."""
+    start: float = time.perf_counter()
+    processes: dict[str, subprocess.Popen] = {
+        python_version: subprocess.Popen(
+            [pyright, "--outputjson", f"--pythonversion={python_version}", *options],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            errors="replace",
+        )
+        for python_version in python_versions
+    }
+    runs: list[PyrightRun] = [parse_run(python_version, process) for python_version, process in processes.items()]
+
+    print_diagnostics(runs)
+    for run in runs:
+        summary: dict[str, object] = run.summary
+        print(
+            f"py{run.python_version}: {summary.get('errorCount', '?')} errors, "
+            f"{summary.get('warningCount', '?')} warnings in {summary.get('filesAnalyzed', '?')} files "
+            f"({summary.get('timeInSec', '?')}s)"
+        )
+    print(f"Checked {len(runs)} Python versions in {time.perf_counter() - start:.1f}s.")
+    return max(run.returncode for run in runs)
+
+
+def parse_run(python_version: str, process: subprocess.Popen) -> PyrightRun:
+    """Waits for a pyright process to finish and parses its JSON report."""
+    output, errors = process.communicate()
+    run: PyrightRun = PyrightRun(python_version=python_version, returncode=process.returncode)
+    try:
+        report: dict = json.loads(output)
+    except json.JSONDecodeError:
+        print(f"----- pyright failed for py{python_version} with exit code {process.returncode} -----")
+        print(output, errors, sep="\n")
+        return run
+    run.summary = report.get("summary", {})
+    run.diagnostics = report.get("generalDiagnostics", [])
+    return run
+
+
+def print_diagnostics(runs: list[PyrightRun]) -> None:
+    """Prints each distinct diagnostic once, noting the Python versions it applies to unless it's all of them."""
+    versions: dict[tuple, list[str]] = defaultdict(list)
+    for run in runs:
+        for diagnostic in run.diagnostics:
+            start: dict = diagnostic.get("range", {}).get("start", {})
+            key: tuple = (
+                diagnostic.get("file", ""),
+                start.get("line", 0),
+                start.get("character", 0),
+                diagnostic.get("severity", ""),
+                diagnostic.get("message", ""),
+                diagnostic.get("rule", ""),
+            )
+            versions[key].append(run.python_version)
+
+    for key in sorted(versions):
+        file, line, character, severity, message, rule = key
+        applies_to: str = "" if len(versions[key]) == len(runs) else f" [py{', py'.join(versions[key])}]"
+        suffix: str = f" ({rule})" if rule else ""
+        print(f"{file}:{line + 1}:{character + 1} - {severity}: {message}{suffix}{applies_to}")
+
+
+def watch_pyright_matrix(pyright: str, python_versions: list[str], options: list[str]) -> None:
+    """Keeps a pyright watcher running for every Python version, prefixing its output with the version."""
+    processes: list[subprocess.Popen] = []
+    threads: list[threading.Thread] = []
+    try:
+        for python_version in python_versions:
+            process: subprocess.Popen = subprocess.Popen(
+                [pyright, "--watch", f"--pythonversion={python_version}", *options],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                errors="replace",
+            )
+            processes.append(process)
+            thread: threading.Thread = threading.Thread(
+                target=forward_output, args=(process.stdout, f"[py{python_version}] "), daemon=True
+            )
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+
+def forward_output(stream: TextIO, prefix: str) -> None:
+    """Prints each line read from the stream with the prefix until the stream closes."""
+    for line in stream:
+        print(f"{prefix}{line}", end="", flush=True)
+
+
+def get_included_paths(project: Path) -> list[Path]:
+    """Returns the paths pyright's config includes, relative to the config file, defaulting to its directory."""
+    config_file: Path = project / "pyrightconfig.json" if project.is_dir() else project
+    try:
+        config: dict = json.loads(config_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        config = {}
+    return [(config_file.parent / include).resolve() for include in config.get("include", ["."])]
+
+
+def get_changed_files(ref: str, include: list[Path]) -> list[str]:
+    """Returns the existing Python files under the included paths that differ from the ref or are untracked."""
+    return get_python_files(
+        commands=[
+            ["git", "diff", "--name-only", "--diff-filter=d", ref],
+            ["git", "ls-files", "--others", "--exclude-standard"],
+        ],
+        include=include,
+    )
+
+
+def get_importing_files(files: list[str], include: list[Path]) -> list[str]:
+    """Returns the other Python files under the included paths that directly import any of the files' modules."""
+    changed: set[str] = {get_module_name(Path(file)) for file in files}
+    candidates: list[str] = get_python_files(
+        commands=[["git", "ls-files", "--cached", "--others", "--exclude-standard"]], include=include
+    )
+    return [
+        file for file in candidates if file not in files and not changed.isdisjoint(get_imported_modules(Path(file)))
+    ]
+
+
+def get_python_files(commands: list[list[str]], include: list[Path]) -> list[str]:
+    """Returns the existing Python files under the included paths among those the git commands list."""
+    root: Path = Path(
+        subprocess.run(
+            ["git", "rev-parse", "--show-toplevel"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    )
+    names: set[str] = set()
+    for command in commands:
+        names.update(subprocess.run(command, cwd=root, capture_output=True, text=True, check=True).stdout.splitlines())
+
+    files: list[str] = []
+    for name in sorted(names):
+        path: Path = (root / name).resolve()
+        if path.suffix in PYTHON_SUFFIXES and path.is_file() and any(path.is_relative_to(i) for i in include):
+            files.append(str(path))
+    return files
+
+
+def get_module_name(path: Path) -> str:
+    """Returns the dotted module name of a file, found by walking up through the packages containing it."""
+    parts: list[str] = [] if path.stem == "__init__" else [path.stem]
+    parent: Path = path.parent
+    while any((parent / f"__init__{suffix}").is_file() for suffix in PYTHON_SUFFIXES):
+        parts.insert(0, parent.name)
+        parent = parent.parent
+    return ".".join(parts)
+
+
+def get_imported_modules(path: Path) -> set[str]:
+    """Returns every module the file imports, along with the packages containing them.
+
+    Names imported with `from module import name` are included as `module.name` too, since they may be
+    submodules. Files that can't be read or parsed are treated as importing nothing.
+    """
+    try:
+        tree: ast.Module = ast.parse(path.read_bytes(), filename=str(path))
+    except (OSError, SyntaxError, ValueError):
+        return set()
+
+    module: str = get_module_name(path)
+    package: list[str] = module.split(".") if path.stem == "__init__" else module.split(".")[:-1]
+    imported: set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imported.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base: str = node.module or ""
+            if node.level:
+                base = ".".join([*package[: len(package) - node.level + 1], *([base] if base else [])])
+            imported.add(base)
+            imported.update(f"{base}.{alias.name}" for alias in node.names)
+
+    return {".".join(name.split(".")[:end]) for name in imported for end in range(1, name.count(".") + 2)}
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """Creates the argument parser for run-pyright-matrix."""
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="run-pyright-matrix",
+        usage="python ./scripts/run-pyright-matrix.py -V 3.9 -V 3.13 --changed",
+        description="Type check against several Python versions at once from a single environment.",
+    )
+    parser.add_argument("files", nargs="*", metavar="FILE", help="Files to check. Defaults to the config's include.")
+    parser.add_argument(
+        "-V",
+        "--python-version",
+        dest="python_versions",
+        action="append",
+        required=True,
+        help="Python version to check against. May be given more than once.",
+    )
+    parser.add_argument("--pythonpath", type=Path, help="Interpreter whose installed packages imports resolve to.")
+    parser.add_argument(
+        "-p", "--project", type=Path, default=Path("pyrightconfig.json"), help="Pyright config file or directory."
+    )
+    parser.add_argument(
+        "--changed",
+        nargs="?",
+        const="HEAD",
+        metavar="REF",
+        help=(
+            "Only check Python files that differ from the git ref (default HEAD), including untracked files, "
+            "and the files that directly import them."
+        ),
+    )
+    parser.add_argument(
+        "-w", "--watch", action="store_true", help="Keep a pyright per version running, rechecking on changes."
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    main()
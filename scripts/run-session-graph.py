@@ -0,0 +1,163 @@
+"""Script responsible for running nox sessions concurrently while respecting the order between them.
+
+Each session is given along with the sessions that have to pass before it starts, for example
+`lint-python:format-python`. Sessions whose dependencies have passed are started right away, up to the
+job limit. Each session's output is captured and printed in one block once it finishes, so output from
+concurrent sessions isn't interleaved. Sessions that depend on a failed session are skipped. A summary
+of every session's status and duration is printed at the end.
+
+Since this script is run by nox, we intentionally only use builtin Python dependencies.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from dataclasses import dataclass
+from graphlib import CycleError
+from graphlib import TopologicalSorter
+
+
+PASSED: str = "passed"
+FAILED: str = "failed"
+SKIPPED: str = "skipped"
+
+
+@dataclass
+class SessionResult:
+    """The outcome of running a single nox session."""
+
+    name: str
+    status: str
+    seconds: float = 0.0
+    output: str = ""
+
+
+def main() -> None:
+    """Parses command line input and passes it through to run_session_graph."""
+    parser: argparse.ArgumentParser = get_parser()
+    args, nox_args = parser.parse_known_args()
+    graph: dict[str, list[str]] = dict(args.session)
+    try:
+        results: list[SessionResult] = run_session_graph(graph=graph, jobs=args.jobs, nox_args=nox_args)
+    except (CycleError, ValueError) as e:
+        parser.error(str(e))
+    sys.exit(0 if all(result.status == PASSED for result in results) else 1)
+
+
+def run_session_graph(graph: dict[str, list[str]], jobs: int, nox_args: list[str]) -> list[SessionResult]:
+    """Runs every session in the graph once its dependencies have passed, returning each session's result.
+
+    Raises:
+        ValueError: If a session depends on a session that isn't in the graph.
+        CycleError: If the sessions depend on each other in a cycle.
+    """
+    for name, dependencies in graph.items():
+        unknown: list[str] = [dependency for dependency in dependencies if dependency not in graph]
+        if unknown:
+            raise ValueError(f"{name} depends on unknown sessions: {', '.join(unknown)}.")
+
+    sorter: TopologicalSorter = TopologicalSorter(graph)
+    sorter.prepare()
+    start: float = time.perf_counter()
+    results: dict[str, SessionResult] = {}
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        running: dict[Future, str] = {}
+        while sorter.is_active():
+            for name in sorter.get_ready():
+                running[executor.submit(run_session, name, nox_args)] = name
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                result: SessionResult = future.result()
+                del running[future]
+                results[result.name] = result
+                print_result(result)
+                if result.status == PASSED:
+                    sorter.done(result.name)
+
+    for name in graph:
+        if name not in results:
+            results[name] = SessionResult(name=name, status=SKIPPED)
+    ordered: list[SessionResult] = [results[name] for name in graph]
+    print_summary(ordered, wall_seconds=time.perf_counter() - start)
+    return ordered
+
+
+def run_session(name: str, nox_args: list[str]) -> SessionResult:
+    """Runs a single nox session, capturing its combined output."""
+    print(f"Starting {name}.", flush=True)
+    start: float = time.perf_counter()
+    process: subprocess.CompletedProcess = subprocess.run(
+        [sys.executable, "-m", "nox", "--session", name, *nox_args],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors="replace",
+    )
+    status: str = PASSED if process.returncode == 0 else FAILED
+    return SessionResult(name=name, status=status, seconds=time.perf_counter() - start, output=process.stdout)
+
+
+def print_result(result: SessionResult) -> None:
+    """Prints a finished session's captured output under a header naming it."""
+    print(f"----- {result.name}: {result.status} in {result.seconds:.1f}s -----")
+    print(result.output, flush=True)
+
+
+def print_summary(results: list[SessionResult], wall_seconds: float) -> None:
+    """Prints each session's status and duration, and how long the whole graph took."""
+    width: int = max(len("session"), *(len(result.name) for result in results))
+    print(f"{'session':<{width}}  {'status':<7}  {'seconds':>7}")
+    for result in results:
+        seconds: str = f"{result.seconds:.1f}" if result.status != SKIPPED else "-"
+        print(f"{result.name:<{width}}  {result.status:<7}  {seconds:>7}")
+    serial_seconds: float = sum(result.seconds for result in results)
+    print(f"Finished in {wall_seconds:.1f}s ({serial_seconds:.1f}s if run one after another).")
+
+
+def parse_session(value: str) -> tuple[str, list[str]]:
+    """Parses a NAME[:DEPENDENCY,...] argument into the session name and its dependencies."""
+    name, _, dependencies = value.partition(":")
+    if not name:
+        raise argparse.ArgumentTypeError(f"Expected NAME[:DEPENDENCY,...], got {value!r}.")
+    return name, [dependency for dependency in dependencies.split(",") if dependency]
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """Creates the argument parser for run-session-graph."""
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="run-session-graph",
+        usage="python ./scripts/run-session-graph.py format-python lint-python:format-python typecheck-3.13",
+        description=(
+            "Run nox sessions concurrently, starting each once the sessions it depends on have passed. "
+            "Unrecognized options are passed through to every nox invocation."
+        ),
+        allow_abbrev=False,
+    )
+    parser.add_argument(
+        "session",
+        type=parse_session,
+        nargs="+",
+        metavar="NAME[:DEPENDENCY,...]",
+        help="Session to run, followed by the sessions that have to pass first.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Maximum number of sessions to run at once. Defaults to the number of CPUs.",
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    main()
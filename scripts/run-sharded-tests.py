@@ -0,0 +1,246 @@
+"""Script responsible for running the test suite split across parallel pytest processes.
+
+Tests are collected once, then assigned to shards using how long each one took in earlier runs, as
+recorded in the junit XML reports under tests/results. Shards are filled longest test first, always
+onto the shard with the least expected work, so they finish at about the same time. Each shard is a
+separate pytest process, so session and module scoped fixtures are set up once per shard.
+
+Every argument other than the runner's own options is passed to pytest verbatim and in order, both
+when collecting and in each shard, so pytest parses options and paths itself. Shards then run only
+their assigned tests through the pytest_shard plugin next to this script.
+
+Each shard writes its own coverage data and junit report. Once all shards finish, the coverage data is
+combined into the regular data file and the reports are merged into a single junit XML file.
+
+Since this is a test runner script, we intentionally only use builtin Python dependencies. pytest and
+coverage are run as subprocesses of the same interpreter.
+"""
+
+import argparse
+import heapq
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from itertools import islice
+from pathlib import Path
+from typing import Optional
+
+
+DEFAULT_DURATION: float = 1.0
+JUNIT_GLOB: str = "test-results-*.xml"
+SCRIPTS_FOLDER: Path = Path(__file__).resolve().parent
+SHARD_PLUGIN: str = "pytest_shard"
+SHARD_FILE_VARIABLE: str = "PYTEST_SHARD_FILE"
+RUNNER_OPTIONS: tuple[str, ...] = ("-n", "--shards", "--results-dir", "--junitxml", "--cov")
+RUNNER_FLAGS: tuple[str, ...] = ("-h", "--help")
+
+
+def main() -> None:
+    """Parses command line input and passes it through to run_sharded_tests."""
+    runner_args, pytest_args = split_args(sys.argv[1:])
+    args: argparse.Namespace = get_parser().parse_args(runner_args)
+    exit_code: int = run_sharded_tests(
+        pytest_args=pytest_args,
+        shards=args.shards,
+        results_dir=args.results_dir,
+        junitxml=args.junitxml,
+        cov=args.cov,
+    )
+    sys.exit(exit_code)
+
+
+def split_args(argv: list[str]) -> tuple[list[str], list[str]]:
+    """Splits the command line into the runner's own options and the arguments to pass on to pytest.
+
+    Runner options may be given as `--option value` or `--option=value`. Everything else, including
+    paths and the values of pytest's own options, is kept for pytest in its original order.
+    """
+    runner_args: list[str] = []
+    pytest_args: list[str] = []
+    remaining = iter(argv)
+    for arg in remaining:
+        name: str = arg.split("=", 1)[0]
+        if arg in RUNNER_FLAGS:
+            runner_args.append(arg)
+        elif name in RUNNER_OPTIONS:
+            runner_args.append(arg)
+            runner_args.extend(islice(remaining, 0 if "=" in arg else 1))
+        else:
+            pytest_args.append(arg)
+    return runner_args, pytest_args
+
+
+def run_sharded_tests(
+    pytest_args: list[str],
+    shards: int,
+    results_dir: Path,
+    junitxml: Optional[Path] = None,
+    cov: Optional[str] = None,
+) -> int:
+    """Runs the tests pytest selects with the given arguments across shards, returning the first non-zero exit code."""
+    node_ids: list[str] = collect(pytest_args=pytest_args)
+    if not node_ids:
+        print("No tests collected.")
+        return 5
+
+    durations: dict[str, float] = load_durations(results_dir)
+    assignments: list[list[str]] = assign_shards(node_ids=node_ids, durations=durations, shards=shards)
+    print(f"Running {len(node_ids)} tests across {len(assignments)} shards.")
+
+    with tempfile.TemporaryDirectory(prefix="pytest-shards-") as temp_dir:
+        shard_dir: Path = Path(temp_dir)
+        exit_codes: list[int] = run_shards(
+            assignments=assignments, pytest_args=pytest_args, shard_dir=shard_dir, cov=cov
+        )
+        if junitxml is not None:
+            merge_junitxml(sorted(shard_dir.glob("junit-*.xml")), junitxml)
+    if cov is not None:
+        subprocess.run([sys.executable, "-m", "coverage", "combine", "--append", "--quiet"])
+    return next((code for code in exit_codes if code != 0), 0)
+
+
+def collect(pytest_args: list[str]) -> list[str]:
+    """Returns the node ids of every test pytest selects with the given arguments.
+
+    The verbosity is set after the given arguments so any -q or -v among them can't change the listing.
+    """
+    result: subprocess.CompletedProcess = subprocess.run(
+        [sys.executable, "-m", "pytest", *pytest_args, "--collect-only", "--verbosity=-1"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode not in (0, 5):
+        print(result.stdout, result.stderr, sep="\n")
+        raise SystemExit(result.returncode)
+    return [line for line in result.stdout.splitlines() if "::" in line]
+
+
+def load_durations(results_dir: Path) -> dict[str, float]:
+    """Returns the mean recorded duration of each test from earlier junit reports, keyed by junit_key."""
+    samples: dict[str, list[float]] = defaultdict(list)
+    for report in sorted(results_dir.glob(JUNIT_GLOB)):
+        try:
+            root: ET.Element = ET.parse(report).getroot()  # noqa: S314 - reports are written by our own runs
+        except ET.ParseError as e:
+            print(f"Ignoring unreadable test report {report}: {e}")
+            continue
+        for case in root.iter("testcase"):
+            classname, name = case.get("classname", ""), case.get("name", "")
+            samples[f"{classname}::{name}"].append(float(case.get("time") or 0.0))
+    return {key: statistics.mean(times) for key, times in samples.items()}
+
+
+def junit_key(node_id: str) -> str:
+    """Returns the classname::name key pytest's junit report uses for a node id."""
+    path, *names = node_id.split("::")
+    module: str = path[: -len(".py")] if path.endswith(".py") else path
+    return "::".join([".".join([module.replace("/", "."), *names[:-1]]), names[-1]])
+
+
+def assign_shards(node_ids: list[str], durations: dict[str, float], shards: int) -> list[list[str]]:
+    """Splits the tests into at most the given number of shards with about equal expected runtimes.
+
+    Tests without a recorded duration are expected to take the mean of the recorded ones. Within each
+    shard, tests keep their collection order.
+    """
+    default: float = statistics.mean(durations.values()) if durations else DEFAULT_DURATION
+    order: dict[str, int] = {node_id: index for index, node_id in enumerate(node_ids)}
+    expected: dict[str, float] = {node_id: durations.get(junit_key(node_id), default) for node_id in node_ids}
+
+    loads: list[tuple[float, int]] = [(0.0, shard) for shard in range(min(shards, len(node_ids)))]
+    assignments: list[list[str]] = [[] for _ in loads]
+    for node_id in sorted(node_ids, key=lambda node: (-expected[node], order[node])):
+        load, shard = heapq.heappop(loads)
+        assignments[shard].append(node_id)
+        heapq.heappush(loads, (load + expected[node_id], shard))
+    return [sorted(assignment, key=order.__getitem__) for assignment in assignments]
+
+
+def run_shards(assignments: list[list[str]], pytest_args: list[str], shard_dir: Path, cov: Optional[str]) -> list[int]:
+    """Runs every shard at once, then prints each shard's output in turn and returns their exit codes.
+
+    Each shard collects with the same pytest arguments and deselects the tests assigned to other shards.
+    """
+    start: float = time.perf_counter()
+    processes: list[tuple[int, subprocess.Popen, Path]] = []
+    for shard, node_ids in enumerate(assignments):
+        shard_file: Path = shard_dir / f"tests-{shard}.txt"
+        shard_file.write_text("\n".join(node_ids), encoding="utf-8")
+        command: list[str] = [
+            sys.executable,
+            "-m",
+            "pytest",
+            "-p",
+            SHARD_PLUGIN,
+            *pytest_args,
+            f"--junitxml={shard_dir / f'junit-{shard}.xml'}",
+        ]
+        env: dict[str, str] = dict(os.environ)
+        env[SHARD_FILE_VARIABLE] = str(shard_file)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [env.get("PYTHONPATH"), str(SCRIPTS_FOLDER)]))
+        if cov is not None:
+            command.extend([f"--cov={cov}", "--cov-report=", "--cov-fail-under=0"])
+            env["COVERAGE_FILE"] = f".coverage.shard-{shard}"
+
+        log_file: Path = shard_dir / f"output-{shard}.log"
+        with log_file.open("wb") as log:
+            process: subprocess.Popen = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT, env=env)
+        processes.append((shard, process, log_file))
+
+    exit_codes: list[int] = [process.wait() for _, process, _ in processes]
+    for (shard, _, log_file), exit_code in zip(processes, exit_codes):
+        print(f"----- shard {shard}: {len(assignments[shard])} tests, exit code {exit_code} -----")
+        print(log_file.read_text(encoding="utf-8", errors="replace"), flush=True)
+    print(f"All shards finished in {time.perf_counter() - start:.2f}s.")
+    return exit_codes
+
+
+def merge_junitxml(reports: list[Path], output: Path) -> None:
+    """Merges the test suites of each shard's junit report into a single report."""
+    merged: ET.Element = ET.Element("testsuites")
+    for report in reports:
+        root: ET.Element = ET.parse(report).getroot()  # noqa: S314 - reports are written by the shards
+        merged.extend(root.iter("testsuite"))
+    output.parent.mkdir(parents=True, exist_ok=True)
+    ET.ElementTree(merged).write(output, encoding="utf-8", xml_declaration=True)
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """Creates the argument parser for run-sharded-tests."""
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="run-sharded-tests",
+        usage="python ./scripts/run-sharded-tests.py [OPTIONS] [PYTEST_ARGS ...]",
+        description=(
+            "Run pytest across parallel shards balanced by recorded test durations. Any argument other than "
+            "the options below, including test paths, is passed to pytest verbatim and in order."
+        ),
+        epilog="example: python ./scripts/run-sharded-tests.py --cov robust_python_demo tests/unit_tests -k formats",
+        allow_abbrev=False,
+    )
+    parser.add_argument(
+        "-n",
+        "--shards",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of pytest processes to run at once. Defaults to the number of CPUs.",
+    )
+    parser.add_argument(
+        "--results-dir",
+        type=Path,
+        default=Path("tests") / "results",
+        help=f"Directory of earlier junit reports ({JUNIT_GLOB}) to read test durations from.",
+    )
+    parser.add_argument("--junitxml", type=Path, help="Path to write the merged junit report to.")
+    parser.add_argument(
+        "--cov", metavar="PACKAGE", help="Measure coverage of the package and combine it into the coverage data file."
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,166 @@
 """Command-line interface."""
 
+import contextlib
+import functools
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Optional
+
 import typer
+from typing_extensions import Annotated
+
+from robust_python_demo.checkpoint import DEFAULT_CHECKPOINT_INTERVAL
+from robust_python_demo.checkpoint import Checkpointer
+from robust_python_demo.checkpoint import CheckpointStore
+from robust_python_demo.checkpoint import Progress
+from robust_python_demo.checkpoint import input_key
+from robust_python_demo.exceptions import RecordFormatError
+from robust_python_demo.executor import Backend
+from robust_python_demo.executor import create_executor
+from robust_python_demo.formats import RecordFormat
+from robust_python_demo.memprofile import MemoryProfiler
+from robust_python_demo.output import BinaryStdoutWriter
+from robust_python_demo.pipeline import STDIN
+from robust_python_demo.pipeline import run
+from robust_python_demo.watch import DEFAULT_POLL_INTERVAL
+from robust_python_demo.watch import watch_directory
 
 
 app: typer.Typer = typer.Typer()
 
+MEMORY_PROFILER_KEY: str = "robust_python_demo.memory_profiler"
+
+
+def start_memory_profiler(ctx: typer.Context, path: Optional[Path]) -> Optional[Path]:
+    """Starts profiling memory when --memprofile is given, writing the report once the command exits.
+
+    The option is eager, so profiling starts before any other option is processed. The report is written
+    when the context closes, which happens whether the command succeeds or fails.
+    """
+    if path is not None and not ctx.resilient_parsing:
+        profiler: MemoryProfiler = MemoryProfiler(path)
+        profiler.start()
+        ctx.meta[MEMORY_PROFILER_KEY] = profiler
+        ctx.call_on_close(profiler.stop)
+    return path
+
 
 @app.command(name="robust-python-demo")
-def main() -> None:
+def main(
+    ctx: typer.Context,
+    inputs: Annotated[
+        Optional[list[Path]],
+        typer.Argument(
+            exists=True,
+            dir_okay=False,
+            allow_dash=True,
+            help="Files to read records from. Reads stdin when omitted or given '-'.",
+        ),
+    ] = None,
+    input_format: Annotated[
+        RecordFormat,
+        typer.Option("--input-format", help="Format of the input records."),
+    ] = RecordFormat.NDJSON,
+    output_format: Annotated[
+        RecordFormat,
+        typer.Option("--output-format", help="Format to write records in. Use 'binary' to pipe into another stage."),
+    ] = RecordFormat.NDJSON,
+    flush_interval: Annotated[
+        Optional[float],
+        typer.Option(min=0, help="Maximum seconds output may sit in the buffer before being written."),
+    ] = None,
+    jobs: Annotated[
+        int,
+        typer.Option("--jobs", "-j", min=1, help="Number of workers to process records on. 1 processes them in-line."),
+    ] = 1,
+    backend: Annotated[
+        Backend,
+        typer.Option(help="Worker pool to use when --jobs is above 1. Threads require a free-threaded build."),
+    ] = Backend.AUTO,
+    resume: Annotated[
+        bool,
+        typer.Option("--resume", help="Skip input already processed by an earlier run over the same files."),
+    ] = False,
+    checkpoint_interval: Annotated[
+        float,
+        typer.Option(min=0, help="Seconds between checkpoints when reading files. 0 disables checkpoints."),
+    ] = DEFAULT_CHECKPOINT_INTERVAL,
+    watch: Annotated[
+        Optional[Path],
+        typer.Option(
+            exists=True,
+            file_okay=False,
+            resolve_path=True,
+            help="Directory to watch, processing files as they are added or changed until interrupted.",
+        ),
+    ] = None,
+    poll_interval: Annotated[
+        float,
+        typer.Option(min=0, help="Seconds between scans of the --watch directory when inotify isn't available."),
+    ] = DEFAULT_POLL_INTERVAL,
+    memprofile: Annotated[  # noqa: ARG001 - handled by start_memory_profiler
+        Optional[Path],
+        typer.Option(
+            dir_okay=False,
+            is_eager=True,
+            callback=start_memory_profiler,
+            help="Trace memory with tracemalloc and write a JSON report of allocation sites to this file.",
+        ),
+    ] = None,
+) -> None:
     """Robust Python Demo."""
+    if watch is not None and inputs:
+        raise typer.BadParameter("can't be combined with input files.", param_hint="--watch")
+
+    paths: list[Path] = inputs or [STDIN]
+    store: Optional[CheckpointStore] = None if watch is not None else get_checkpoint_store(paths, input_format, resume)
+    progress: Optional[Progress] = store.load() if store is not None and resume else None
+    checkpointer: Optional[Checkpointer] = None
+    profiler: Optional[MemoryProfiler] = ctx.meta.get(MEMORY_PROFILER_KEY)
+    if store is not None and checkpoint_interval > 0:
+        checkpointer = Checkpointer(store, checkpoint_interval)
+
+    try:
+        with contextlib.ExitStack() as stack:
+            writer = stack.enter_context(BinaryStdoutWriter(flush_interval=flush_interval))
+            executor = stack.enter_context(create_executor(backend, jobs)) if jobs > 1 else None
+            if watch is not None:
+                handle = functools.partial(process_file, input_format, output_format, writer, executor, profiler)
+                with contextlib.suppress(KeyboardInterrupt):
+                    watch_directory(watch, handle, poll_interval)
+            else:
+                run(paths, input_format, output_format, writer, executor, progress, checkpointer, profiler)
+        if store is not None:
+            store.clear()
+    except BrokenPipeError:
+        raise typer.Exit(code=1) from None
+    except RecordFormatError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(code=1) from e
+
+
+def get_checkpoint_store(paths: list[Path], input_format: RecordFormat, resume: bool) -> Optional[CheckpointStore]:
+    """Returns the checkpoint store for the given inputs, or None when reading from stdin."""
+    if STDIN not in paths:
+        return CheckpointStore(input_key(paths, input_format))
+    if resume:
+        raise typer.BadParameter(
+            "stdin can't be checkpointed, so resuming requires file inputs.", param_hint="--resume"
+        )
+    return None
+
+
+def process_file(
+    input_format: RecordFormat,
+    output_format: RecordFormat,
+    writer: BinaryStdoutWriter,
+    executor: Optional[Executor],
+    profiler: Optional[MemoryProfiler],
+    path: Path,
+) -> None:
+    """Processes a single file picked up by --watch, flushing its output as soon as it's done."""
+    run([path], input_format, output_format, writer, executor, profiler=profiler)
+    writer.flush()
 
 
 if __name__ == "__main__":
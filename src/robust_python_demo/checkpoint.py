@@ -0,0 +1,138 @@
+"""Checkpoints that let long batch runs resume where they left off."""
+
+import contextlib
+import dataclasses
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+from typing import Optional
+
+import platformdirs
+from loguru import logger
+
+from robust_python_demo.formats import RecordFormat
+from robust_python_demo.output import BinaryStdoutWriter
+
+
+APP_NAME: str = "robust-python-demo"
+CHECKPOINT_VERSION: int = 1
+DEFAULT_CHECKPOINT_INTERVAL: float = 60.0
+
+
+@dataclass
+class Progress:
+    """How far a run has got through its inputs, along with running totals."""
+
+    input_index: int = 0
+    offset: int = 0
+    records: int = 0
+    bytes_written: int = 0
+
+
+def default_checkpoint_dir() -> Path:
+    """Returns the directory checkpoints are stored in, under the user's state directory."""
+    return platformdirs.user_state_path(APP_NAME) / "checkpoints"
+
+
+def input_key(inputs: Sequence[Path], input_format: RecordFormat) -> str:
+    """Returns a key identifying a run's inputs.
+
+    The key covers each file's resolved path, size and modification time along with the input format,
+    so a checkpoint is never applied to inputs that have changed since it was written.
+    """
+    identity: list[object] = [input_format.value]
+    for path in inputs:
+        stat: os.stat_result = path.stat()
+        identity.append([str(path.resolve()), stat.st_size, stat.st_mtime_ns])
+    return hashlib.sha256(json.dumps(identity).encode("utf-8")).hexdigest()
+
+
+def write_atomic(path: Path, text: str) -> None:
+    """Writes text to a temporary file beside path, fsyncs it and atomically renames it over path.
+
+    The parent directory is created if needed. If anything fails, the temporary file is removed and
+    whatever was previously at path is left untouched.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    temp_path: Path = Path(temp_name)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as temp_file:
+            temp_file.write(text)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        temp_path.replace(path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            temp_path.unlink()
+        raise
+
+
+class CheckpointStore:
+    """Loads and atomically saves the checkpoint for a single input key."""
+
+    def __init__(self, key: str, directory: Optional[Path] = None) -> None:
+        """Initializes CheckpointStore."""
+        self.key: str = key
+        self.path: Path = (directory or default_checkpoint_dir()) / f"{key}.json"
+
+    def load(self) -> Optional[Progress]:
+        """Returns the saved progress, or None if there is no usable checkpoint."""
+        try:
+            data: dict = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.pop("version") != CHECKPOINT_VERSION or data.pop("key") != self.key:
+                raise ValueError("checkpoint was written for different inputs.")
+            return Progress(**data)
+        except FileNotFoundError:
+            return None
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            logger.warning("Ignoring unreadable checkpoint {}: {}", self.path, e)
+            return None
+
+    def save(self, progress: Progress) -> None:
+        """Saves progress by writing a temporary file and atomically renaming it over the checkpoint.
+
+        The temporary file is fsynced before the rename, so a crash leaves either the previous
+        checkpoint or the new one in place, never a partial write.
+        """
+        data: dict = {"version": CHECKPOINT_VERSION, "key": self.key, **dataclasses.asdict(progress)}
+        write_atomic(self.path, json.dumps(data))
+
+    def clear(self) -> None:
+        """Removes the checkpoint, if any."""
+        with contextlib.suppress(FileNotFoundError):
+            self.path.unlink()
+
+
+class Checkpointer:
+    """Periodically saves progress to a CheckpointStore while a run is underway."""
+
+    def __init__(
+        self,
+        store: CheckpointStore,
+        interval: float = DEFAULT_CHECKPOINT_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initializes Checkpointer."""
+        self.store: CheckpointStore = store
+        self.interval: float = interval
+        self._clock: Callable[[], float] = clock
+        self._last_save: float = clock()
+
+    def update(self, progress: Progress, writer: BinaryStdoutWriter) -> None:
+        """Saves progress if the checkpoint interval has elapsed since the last save.
+
+        The writer is flushed first so every record covered by the checkpoint has been written out.
+        """
+        now: float = self._clock()
+        if now - self._last_save < self.interval:
+            return
+        writer.flush()
+        self.store.save(progress)
+        self._last_save = now
@@ -0,0 +1,13 @@
+"""Exceptions raised by robust_python_demo."""
+
+
+class RobustPythonDemoError(Exception):
+    """Base class for errors raised by robust_python_demo."""
+
+
+class RecordFormatError(RobustPythonDemoError, ValueError):
+    """Exception raised when input can't be decoded in the requested record format."""
+
+    def __init__(self, record_format: str, reason: str):
+        message: str = f"Invalid {record_format} input: {reason}"
+        super().__init__(message)
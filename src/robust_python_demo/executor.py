@@ -0,0 +1,99 @@
+"""Execution backends used to process records in parallel."""
+
+import itertools
+import os
+import sys
+from collections import deque
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import Executor
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Callable
+from typing import Optional
+from typing import TypeVar
+
+from loguru import logger
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_BATCH_SIZE: int = 1024
+
+
+class Backend(str, Enum):
+    """Pools records can be processed on when running with more than one job."""
+
+    AUTO = "auto"
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+def is_free_threaded() -> bool:
+    """Whether this is a free-threaded CPython build running with the GIL disabled."""
+    is_gil_enabled: Optional[Callable[[], bool]] = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def resolve_backend(backend: Backend) -> Backend:
+    """Resolves the requested backend to the pool that will actually be used.
+
+    Threads only scale when the GIL is disabled, so on GIL builds both ``auto`` and ``thread``
+    fall back to the process pool.
+    """
+    if backend is Backend.PROCESS:
+        return Backend.PROCESS
+    if is_free_threaded():
+        return Backend.THREAD
+    if backend is Backend.THREAD:
+        logger.warning("The GIL is enabled, so the thread backend won't scale. Falling back to the process pool.")
+    return Backend.PROCESS
+
+
+def create_executor(backend: Backend, workers: int) -> Executor:
+    """Creates the executor for the resolved backend with the given number of workers."""
+    if resolve_backend(backend) is Backend.THREAD:
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="robust-python-demo")
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def map_ordered(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    executor: Executor,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_pending: Optional[int] = None,
+) -> Iterator[R]:
+    """Maps func over items on the executor in batches, yielding results in input order.
+
+    Batching amortizes the per-task overhead (and pickling, for the process pool). At most
+    ``max_pending`` batches are in flight at once, so large inputs are streamed through the pool
+    instead of being read up front.
+
+    Args:
+        func: Function applied to each item. Must be picklable when used with the process pool.
+        items: Items to map over.
+        executor: Executor to submit batches to.
+        batch_size: Number of items handed to a worker at once.
+        max_pending: Maximum number of batches in flight. Defaults to twice the CPU count.
+    """
+    limit: int = max_pending or 2 * (os.cpu_count() or 1)
+    pending: deque[Future[list[R]]] = deque()
+    iterator: Iterator[T] = iter(items)
+    while True:
+        batch: list[T] = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            break
+        pending.append(executor.submit(_apply, func, batch))
+        if len(pending) >= limit:
+            yield from pending.popleft().result()
+    while pending:
+        yield from pending.popleft().result()
+
+
+def _apply(func: Callable[[T], R], batch: list[T]) -> list[R]:
+    """Applies func to each item of a batch inside a worker."""
+    return [func(item) for item in batch]
@@ -0,0 +1,291 @@
+"""Record formats used to read and write records between CLI stages.
+
+Two formats are supported:
+
+* ``ndjson``: one JSON object per line. Human readable and the default.
+* ``binary``: length-prefixed frames meant for piping one ``robust-python-demo`` stage into the next.
+
+Each binary frame is a little-endian ``uint32`` payload length followed by the payload. The payload
+starts with a schema: its ``uint32`` byte length, a ``uint16`` field count, a ``uint16`` key length
+and one byte type tag per field, then the UTF-8 keys. The fixed-size values follow in field order
+(``int64``, ``float64``, and a ``uint32`` byte length for each string), and then the UTF-8 bytes of
+every string. Nested values and integers outside the ``int64`` range fall back to embedded JSON.
+
+Records in a stream usually share their keys and value types, and so their schema. Decoded schemas
+are cached, so each record after the first is decoded with a single ``struct`` call for its
+fixed-size values plus one slice per string, rather than parsing every field header and key again.
+"""
+
+import json
+import struct
+from collections.abc import Iterator
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+from typing import BinaryIO
+from typing import Callable
+from typing import Optional
+
+from robust_python_demo.exceptions import RecordFormatError
+
+
+Record = dict[str, Any]
+
+DEFAULT_CHUNK_SIZE: int = 1 << 20
+
+_FRAME: struct.Struct = struct.Struct("<I")
+_COUNT: struct.Struct = struct.Struct("<H")
+_FIELD: struct.Struct = struct.Struct("<HB")
+_LENGTH: struct.Struct = struct.Struct("<I")
+
+_INT_MIN: int = -(1 << 63)
+_INT_MAX: int = (1 << 63) - 1
+_MAX_KEY_LENGTH: int = (1 << 16) - 1
+_MAX_FIELDS: int = (1 << 16) - 1
+_MAX_SCHEMAS: int = 1024
+# JSON allows lone surrogates in strings, so keys and strings are encoded with them passed through as-is.
+_ERRORS: str = "surrogatepass"
+
+_TAG_NONE: int = ord("N")
+_TAG_TRUE: int = ord("T")
+_TAG_FALSE: int = ord("F")
+_TAG_INT: int = ord("i")
+_TAG_FLOAT: int = ord("d")
+_TAG_STR: int = ord("s")
+_TAG_JSON: int = ord("j")
+
+_CONSTANTS: dict[int, Any] = {_TAG_NONE: None, _TAG_TRUE: True, _TAG_FALSE: False}
+_VALUE_CODES: dict[int, str] = {_TAG_INT: "q", _TAG_FLOAT: "d", _TAG_STR: "I", _TAG_JSON: "I"}
+
+_SCHEMAS: dict[tuple[tuple[str, ...], tuple[int, ...]], tuple[bytes, struct.Struct]] = {}
+
+
+class RecordFormat(str, Enum):
+    """Formats records can be read and written in."""
+
+    NDJSON = "ndjson"
+    BINARY = "binary"
+
+
+def encode_ndjson(record: Record) -> bytes:
+    """Encodes a record as a single line of compact JSON."""
+    return json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def iter_ndjson(stream: BinaryIO) -> Iterator[Record]:
+    """Yields records from a stream of newline-delimited JSON objects, skipping blank lines."""
+    for _, record in iter_ndjson_offsets(stream):
+        yield record
+
+
+def iter_ndjson_offsets(stream: BinaryIO) -> Iterator[tuple[int, Record]]:
+    """Yields each NDJSON record along with the number of bytes read up to the end of its line."""
+    position: int = 0
+    for line_number, line in enumerate(stream, start=1):
+        position += len(line)
+        if not line.strip():
+            continue
+        try:
+            record: Any = json.loads(line)
+        except ValueError as e:
+            raise RecordFormatError(RecordFormat.NDJSON.value, f"line {line_number}: {e}") from e
+        if not isinstance(record, dict):
+            raise RecordFormatError(RecordFormat.NDJSON.value, f"line {line_number}: expected a JSON object.")
+        yield position, record
+
+
+def encode_binary(record: Record) -> bytes:
+    """Encodes a record as a single length-prefixed binary frame."""
+    values: list[Any] = []
+    texts: list[bytes] = []
+    tags: tuple[int, ...] = tuple([_encode_value(value, values, texts) for value in record.values()])
+    shape: tuple[tuple[str, ...], tuple[int, ...]] = (tuple(record), tags)
+    schema: Optional[tuple[bytes, struct.Struct]] = _SCHEMAS.get(shape)
+    if schema is None:
+        schema = _encode_schema(*shape)
+    header, fixed = schema
+    payload: bytes = b"".join([header, fixed.pack(*values), *texts])
+    return _FRAME.pack(len(payload)) + payload
+
+
+def _encode_schema(keys: tuple[str, ...], tags: tuple[int, ...]) -> tuple[bytes, struct.Struct]:
+    """Encodes a schema along with the struct for its fixed-size values, caching both for later records."""
+    if len(keys) > _MAX_FIELDS:
+        raise RecordFormatError(RecordFormat.BINARY.value, f"records are limited to {_MAX_FIELDS} fields.")
+    encoded_keys: list[bytes] = [key.encode("utf-8", _ERRORS) for key in keys]
+    if any(len(key) > _MAX_KEY_LENGTH for key in encoded_keys):
+        raise RecordFormatError(RecordFormat.BINARY.value, f"keys are limited to {_MAX_KEY_LENGTH} bytes.")
+
+    schema: bytearray = bytearray(_COUNT.pack(len(keys)))
+    for key, tag in zip(encoded_keys, tags):
+        schema += _FIELD.pack(len(key), tag)
+    for key in encoded_keys:
+        schema += key
+    fixed: struct.Struct = struct.Struct("".join(["<", *(_VALUE_CODES.get(tag, "") for tag in tags)]))
+
+    if len(_SCHEMAS) >= _MAX_SCHEMAS:
+        _SCHEMAS.clear()
+    encoded: tuple[bytes, struct.Struct] = (_LENGTH.pack(len(schema)) + schema, fixed)
+    _SCHEMAS[(keys, tags)] = encoded
+    return encoded
+
+
+def _encode_value(value: Any, values: list[Any], texts: list[bytes]) -> int:
+    """Returns the type tag for the value, appending its fixed-size value and UTF-8 text if it has them."""
+    value_type: type = type(value)
+    if value is None:
+        return _TAG_NONE
+    if value_type is bool:
+        return _TAG_TRUE if value else _TAG_FALSE
+    if value_type is int and _INT_MIN <= value <= _INT_MAX:
+        values.append(value)
+        return _TAG_INT
+    if value_type is float:
+        values.append(value)
+        return _TAG_FLOAT
+
+    tag: int = _TAG_STR if value_type is str else _TAG_JSON
+    text: bytes = (value if tag == _TAG_STR else json.dumps(value, separators=(",", ":"))).encode("utf-8", _ERRORS)
+    values.append(len(text))
+    texts.append(text)
+    return tag
+
+
+def iter_binary(stream: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Record]:
+    """Yields records from a stream of length-prefixed binary frames.
+
+    The stream is read in large chunks and frames are decoded in place from each chunk. Only a
+    trailing partial frame is copied forward into the next read.
+    """
+    for _, record in iter_binary_offsets(stream, chunk_size=chunk_size):
+        yield record
+
+
+def iter_binary_offsets(stream: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[tuple[int, Record]]:
+    """Yields each binary record along with the number of bytes read up to the end of its frame.
+
+    Chunks are read with ``read1`` where the stream has it, so records are yielded as soon as they
+    arrive on a pipe instead of once a whole chunk has filled. The rest of a frame larger than a
+    chunk is read in one go, since none of it can be decoded before the frame is complete.
+    """
+    read_chunk: Callable[[int], bytes] = getattr(stream, "read1", stream.read)
+    position: int = 0
+    pending: bytes = b""
+    needed: int = chunk_size
+    while True:
+        chunk: bytes = stream.read(needed) if needed > chunk_size else read_chunk(chunk_size)
+        if not chunk:
+            break
+        data: bytes = pending + chunk if pending else chunk
+        offset: int = 0
+        while offset + _FRAME.size <= len(data):
+            (length,) = _FRAME.unpack_from(data, offset)
+            end: int = offset + _FRAME.size + length
+            if end > len(data):
+                break
+            yield position + end, _decode_payload(data, offset + _FRAME.size, end)
+            offset = end
+        position += offset
+        pending = data[offset:]
+        needed = _bytes_needed(pending)
+
+    if pending:
+        raise RecordFormatError(RecordFormat.BINARY.value, "truncated frame at end of input.")
+
+
+def _bytes_needed(pending: bytes) -> int:
+    """Returns how many more bytes are required to complete the pending frame."""
+    if len(pending) < _FRAME.size:
+        return _FRAME.size - len(pending)
+    (length,) = _FRAME.unpack_from(pending, 0)
+    return _FRAME.size + length - len(pending)
+
+
+@dataclass(frozen=True)
+class _Layout:
+    """A decoded schema: each field's key and type tag, and the struct holding its fixed-size values."""
+
+    fields: tuple[tuple[str, int], ...]
+    values: struct.Struct
+
+
+_LAYOUTS: dict[bytes, _Layout] = {}
+
+
+def _load_layout(schema: bytes) -> _Layout:
+    """Decodes a schema into a layout, caching it for the following records that share it."""
+    (field_count,) = _COUNT.unpack_from(schema, 0)
+    headers: list[tuple[int, int]] = [
+        _FIELD.unpack_from(schema, _COUNT.size + index * _FIELD.size) for index in range(field_count)
+    ]
+    offset: int = _COUNT.size + field_count * _FIELD.size
+    fields: list[tuple[str, int]] = []
+    codes: list[str] = ["<"]
+    for key_length, tag in headers:
+        if tag not in _VALUE_CODES and tag not in _CONSTANTS:
+            raise ValueError(f"unknown type tag {tag!r}.")
+        fields.append((schema[offset : offset + key_length].decode("utf-8", _ERRORS), tag))
+        codes.append(_VALUE_CODES.get(tag, ""))
+        offset += key_length
+    if offset != len(schema):
+        raise ValueError("schema length does not match its fields.")
+
+    if len(_LAYOUTS) >= _MAX_SCHEMAS:
+        _LAYOUTS.clear()
+    layout: _Layout = _Layout(fields=tuple(fields), values=struct.Struct("".join(codes)))
+    _LAYOUTS[schema] = layout
+    return layout
+
+
+def _decode_payload(data: bytes, offset: int, end: int) -> Record:
+    """Decodes the fields of a single frame's payload.
+
+    Fields are decoded straight out of the chunk that was read; only the decoded strings are copied.
+    """
+    record: Record = {}
+    try:
+        (schema_length,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        schema: bytes = data[offset : offset + schema_length]
+        layout: Optional[_Layout] = _LAYOUTS.get(schema)
+        if layout is None:
+            layout = _load_layout(schema)
+        offset += schema_length
+        values: tuple[Any, ...] = layout.values.unpack_from(data, offset)
+        offset += layout.values.size
+
+        index: int = 0
+        for key, tag in layout.fields:
+            if tag in (_TAG_STR, _TAG_JSON):
+                length: int = values[index]
+                text: str = data[offset : offset + length].decode("utf-8", _ERRORS)
+                record[key] = text if tag == _TAG_STR else json.loads(text)
+                offset += length
+                index += 1
+            elif tag in (_TAG_INT, _TAG_FLOAT):
+                record[key] = values[index]
+                index += 1
+            else:
+                record[key] = _CONSTANTS[tag]
+    except (struct.error, UnicodeDecodeError, ValueError) as e:
+        raise RecordFormatError(RecordFormat.BINARY.value, str(e)) from e
+
+    if offset != end:
+        raise RecordFormatError(RecordFormat.BINARY.value, "frame length does not match its fields.")
+    return record
+
+
+ENCODERS: dict[RecordFormat, Callable[[Record], bytes]] = {
+    RecordFormat.NDJSON: encode_ndjson,
+    RecordFormat.BINARY: encode_binary,
+}
+
+DECODERS: dict[RecordFormat, Callable[[BinaryIO], Iterator[Record]]] = {
+    RecordFormat.NDJSON: iter_ndjson,
+    RecordFormat.BINARY: iter_binary,
+}
+
+OFFSET_DECODERS: dict[RecordFormat, Callable[[BinaryIO], Iterator[tuple[int, Record]]]] = {
+    RecordFormat.NDJSON: iter_ndjson_offsets,
+    RecordFormat.BINARY: iter_binary_offsets,
+}
@@ -0,0 +1,155 @@
+"""Memory profiling with tracemalloc, for tracking down growth over long runs.
+
+Snapshots are taken at stage boundaries: when profiling starts, after each input has been processed and
+when the run ends. Each snapshot is summarized as soon as it is taken and only the most recent one is
+kept for diffing against the next. The report keeps the summaries of the first few snapshots and of the
+most recent ones, counting the ones dropped in between, so profiling a long run doesn't itself grow.
+Only the main process is traced, so allocations made on the process pool backend's workers aren't
+included.
+"""
+
+import json
+import os
+import tracemalloc
+from collections import deque
+from pathlib import Path
+from typing import Optional
+
+from robust_python_demo.checkpoint import write_atomic
+
+
+REPORT_VERSION: int = 1
+DEFAULT_TOP_LIMIT: int = 25
+DEFAULT_TRACEBACK_FRAMES: int = 1
+DEFAULT_HISTORY_HEAD: int = 10
+DEFAULT_HISTORY_TAIL: int = 40
+
+_FILTERS: tuple[tracemalloc.Filter, ...] = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _format_site(trace: tracemalloc.Traceback) -> dict[str, object]:
+    """Returns the allocation site of a traceback as a JSON-friendly dict."""
+    frame: tracemalloc.Frame = trace[0]
+    return {"file": frame.filename, "line": frame.lineno}
+
+
+class _History:
+    """Keeps the first head entries and the most recent tail entries, counting the ones dropped in between."""
+
+    def __init__(self, head: int, tail: int) -> None:
+        """Initializes _History."""
+        self.head: int = head
+        self.tail: int = tail
+        self.first: list[dict[str, object]] = []
+        self.last: deque[dict[str, object]] = deque(maxlen=tail)
+        self.dropped: int = 0
+
+    def append(self, entry: dict[str, object]) -> None:
+        """Adds an entry, dropping the oldest entry after the head once the tail is full."""
+        if len(self.first) < self.head:
+            self.first.append(entry)
+            return
+        if len(self.last) == self.tail:
+            self.dropped += 1
+        self.last.append(entry)
+
+    def entries(self) -> list[dict[str, object]]:
+        """Returns the kept entries in the order they were added."""
+        return [*self.first, *self.last]
+
+
+class MemoryProfiler:
+    """Takes tracemalloc snapshots at stage boundaries and writes a JSON report of them on stop.
+
+    The report lists, for each kept snapshot, the memory traced at that point, the peak traced since the
+    previous snapshot and the top allocation sites. Consecutive snapshots are diffed to show which sites
+    grew in between, and the overall peak traced memory is recorded at the top level. Only the first
+    ``head`` and the most recent ``tail`` snapshots and diffs are kept.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        limit: int = DEFAULT_TOP_LIMIT,
+        frames: int = DEFAULT_TRACEBACK_FRAMES,
+        head: int = DEFAULT_HISTORY_HEAD,
+        tail: int = DEFAULT_HISTORY_TAIL,
+    ) -> None:
+        """Initializes MemoryProfiler."""
+        self.path: Path = path
+        self.limit: int = limit
+        self.frames: int = frames
+        self.snapshots: _History = _History(head, tail)
+        self.diffs: _History = _History(head, tail)
+        self.peak: int = 0
+        self._previous: Optional[tuple[str, tracemalloc.Snapshot]] = None
+        self._started_tracing: bool = False
+
+    def start(self) -> None:
+        """Starts tracing allocations, unless something else already is, and takes the first snapshot."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        tracemalloc.reset_peak()
+        self.snapshot("start")
+
+    def snapshot(self, label: str) -> None:
+        """Takes a snapshot, summarizes it and diffs it against the previous one."""
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        self.peak = max(self.peak, peak)
+        snapshot: tracemalloc.Snapshot = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+        self.snapshots.append(
+            {
+                "label": label,
+                "current_bytes": current,
+                "peak_bytes": peak,
+                "top": [
+                    {**_format_site(stat.traceback), "size_bytes": stat.size, "count": stat.count}
+                    for stat in snapshot.statistics("lineno")[: self.limit]
+                ],
+            }
+        )
+        if self._previous is not None:
+            previous_label, previous = self._previous
+            self.diffs.append(
+                {
+                    "from": previous_label,
+                    "to": label,
+                    "top": [
+                        {
+                            **_format_site(stat.traceback),
+                            "size_diff_bytes": stat.size_diff,
+                            "size_bytes": stat.size,
+                            "count_diff": stat.count_diff,
+                            "count": stat.count,
+                        }
+                        for stat in snapshot.compare_to(previous, "lineno")[: self.limit]
+                    ],
+                }
+            )
+        self._previous = (label, snapshot)
+
+    def stop(self) -> None:
+        """Takes a final snapshot, writes the report and stops tracing if this profiler started it."""
+        self.snapshot("end")
+        report: dict[str, object] = {
+            "version": REPORT_VERSION,
+            "pid": os.getpid(),
+            "peak_bytes": self.peak,
+            "snapshots": self.snapshots.entries(),
+            "snapshots_dropped": self.snapshots.dropped,
+            "diffs": self.diffs.entries(),
+            "diffs_dropped": self.diffs.dropped,
+        }
+        self._previous = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        write_atomic(self.path, json.dumps(report, indent=2))
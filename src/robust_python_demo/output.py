@@ -0,0 +1,200 @@
+"""Batched binary output written directly to the stdout file descriptor."""
+
+import functools
+import io
+import os
+import sys
+import threading
+import time
+from types import TracebackType
+from typing import BinaryIO
+from typing import Callable
+from typing import Optional
+from typing import Type
+
+
+DEFAULT_BUFFER_SIZE: int = 1 << 20
+
+
+class BinaryStdoutWriter:
+    """Accumulates encoded records in a reusable buffer and writes them out in large blocks.
+
+    Records are copied into a preallocated bytearray and only handed to ``os.write`` once the
+    buffer fills up, the flush interval elapses, or the writer is flushed/closed explicitly.
+    Records larger than the buffer bypass it and are written straight through.
+
+    With a positive flush interval, a background thread flushes data that has waited that long even
+    while no new records arrive, so output keeps flowing when the input pauses. Buffer access is
+    guarded by a lock shared with that thread.
+
+    If the reader on the other end of the pipe goes away (e.g. ``| head``), the stdout file
+    descriptor is pointed at ``os.devnull`` so interpreter shutdown doesn't emit a second error,
+    and ``BrokenPipeError`` is raised so the caller can stop producing output.
+    """
+
+    def __init__(
+        self,
+        fd: Optional[int] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        flush_interval: Optional[float] = None,
+    ) -> None:
+        """Initializes BinaryStdoutWriter.
+
+        Args:
+            fd: File descriptor to write to. Defaults to the descriptor backing ``sys.stdout``, or to
+                ``sys.stdout.buffer`` when stdout has been replaced by an object without one.
+            buffer_size: Number of bytes to accumulate before writing a block.
+            flush_interval: Maximum number of seconds buffered data may wait before being written.
+                ``None`` only flushes when the buffer is full or on close.
+        """
+        if buffer_size <= 0:
+            raise ValueError(f"buffer_size must be positive, got {buffer_size}.")
+        if flush_interval is not None and flush_interval < 0:
+            raise ValueError(f"flush_interval must not be negative, got {flush_interval}.")
+
+        self.fd: Optional[int] = fd
+        if fd is None:
+            sys.stdout.flush()
+            try:
+                self.fd = sys.stdout.fileno()
+            except (AttributeError, io.UnsupportedOperation):
+                self.fd = None
+        self._raw_write: Callable[[memoryview], int] = (
+            _stream_writer(sys.stdout.buffer) if self.fd is None else functools.partial(os.write, self.fd)
+        )
+        self.flush_interval: Optional[float] = flush_interval
+        self._buffer: bytearray = bytearray(buffer_size)
+        self._view: memoryview = memoryview(self._buffer)
+        self._position: int = 0
+        self._last_flush: float = time.monotonic()
+        self._closed: bool = False
+        self._error: Optional[OSError] = None
+        self._lock: threading.Lock = threading.Lock()
+        self._stop: threading.Event = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if flush_interval:
+            self._flusher = threading.Thread(target=self._flush_periodically, args=(flush_interval,), daemon=True)
+            self._flusher.start()
+
+    @property
+    def closed(self) -> bool:
+        """Whether the writer has been closed or lost its reader."""
+        return self._closed
+
+    def write(self, data: bytes) -> None:
+        """Buffers the provided bytes, writing out a block whenever the buffer fills up."""
+        with self._lock:
+            self._check_open()
+            size: int = len(data)
+            if self._position + size > len(self._buffer):
+                self._flush()
+                if size > len(self._buffer):
+                    self._write_all(memoryview(data))
+                    return
+
+            self._view[self._position : self._position + size] = data
+            self._position += size
+
+            if self.flush_interval is not None and time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+
+    def flush(self) -> None:
+        """Writes any buffered bytes to the file descriptor."""
+        with self._lock:
+            if self._error is not None:
+                raise self._error
+            self._flush()
+
+    def close(self) -> None:
+        """Flushes remaining bytes and closes the writer. The file descriptor itself is left open."""
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._lock:
+            if self._closed:
+                return
+            try:
+                self._flush()
+            finally:
+                self._closed = True
+                self._view.release()
+
+    def _check_open(self) -> None:
+        """Raises the error that closed the writer in the background, or ValueError if it was closed."""
+        if self._error is not None:
+            raise self._error
+        if self._closed:
+            raise ValueError("write to closed BinaryStdoutWriter.")
+
+    def _flush(self) -> None:
+        """Writes any buffered bytes. Must be called with the lock held."""
+        if self._position:
+            self._write_all(self._view[: self._position])
+            self._position = 0
+        self._last_flush = time.monotonic()
+
+    def _flush_periodically(self, interval: float) -> None:
+        """Flushes buffered bytes once they have waited for the interval, until the writer is closed.
+
+        An error writing in the background is kept and raised from the next call on the writer.
+        """
+        delay: float = interval
+        while not self._stop.wait(delay):
+            with self._lock:
+                if self._closed:
+                    return
+                delay = self._last_flush + interval - time.monotonic()
+                if delay <= 0:
+                    try:
+                        self._flush()
+                    except OSError as e:
+                        self._error = e
+                        return
+                    delay = interval
+
+    def _write_all(self, data: memoryview) -> None:
+        """Writes the full memoryview, retrying on partial writes."""
+        try:
+            while data:
+                written: int = self._raw_write(data)
+                data = data[written:]
+        except BrokenPipeError:
+            self._position = 0
+            self._closed = True
+            self._view.release()
+            if self.fd is not None:
+                _redirect_to_devnull(self.fd)
+            raise
+
+    def __enter__(self) -> "BinaryStdoutWriter":
+        """Returns the writer for use as a context manager."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Closes the writer on exit from the context manager."""
+        self.close()
+
+
+def _redirect_to_devnull(fd: int) -> None:
+    """Points the file descriptor at os.devnull so later flushes at shutdown don't fail."""
+    devnull: int = os.open(os.devnull, os.O_WRONLY)
+    try:
+        os.dup2(devnull, fd)
+    finally:
+        os.close(devnull)
+
+
+def _stream_writer(stream: BinaryIO) -> Callable[[memoryview], int]:
+    """Wraps a binary stream so each block is written and flushed through to its target."""
+
+    def write(data: memoryview) -> int:
+        written: int = stream.write(data)
+        stream.flush()
+        return written
+
+    return write
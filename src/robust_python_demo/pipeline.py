@@ -0,0 +1,102 @@
+"""Record pipeline behind the robust-python-demo command."""
+
+import contextlib
+import functools
+import sys
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Sequence
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import BinaryIO
+from typing import Callable
+from typing import Optional
+
+from robust_python_demo.checkpoint import Checkpointer
+from robust_python_demo.checkpoint import Progress
+from robust_python_demo.executor import map_ordered
+from robust_python_demo.formats import ENCODERS
+from robust_python_demo.formats import OFFSET_DECODERS
+from robust_python_demo.formats import Record
+from robust_python_demo.formats import RecordFormat
+from robust_python_demo.memprofile import MemoryProfiler
+from robust_python_demo.output import BinaryStdoutWriter
+
+
+STDIN: Path = Path("-")
+
+
+def process_record(record: Record) -> Record:
+    """Processes a single record.
+
+    This is the per-record stage of the pipeline. Records currently pass through unchanged.
+    """
+    return record
+
+
+def process_and_encode(encode: Callable[[Record], bytes], item: tuple[int, Record]) -> tuple[int, bytes]:
+    """Processes a single record and encodes the result, so both happen on the same worker.
+
+    The record's input offset is passed through untouched so progress can be tracked in order.
+    """
+    offset, record = item
+    return offset, encode(process_record(record))
+
+
+@contextlib.contextmanager
+def open_input(path: Path) -> Iterator[BinaryIO]:
+    """Opens an input path for binary reading, treating ``-`` as stdin."""
+    if path == STDIN:
+        yield sys.stdin.buffer
+        return
+    with path.open("rb") as stream:
+        yield stream
+
+
+def run(
+    inputs: Sequence[Path],
+    input_format: RecordFormat,
+    output_format: RecordFormat,
+    writer: BinaryStdoutWriter,
+    executor: Optional[Executor] = None,
+    progress: Optional[Progress] = None,
+    checkpointer: Optional[Checkpointer] = None,
+    profiler: Optional[MemoryProfiler] = None,
+) -> Progress:
+    """Reads records from each input, processes them and writes them out, returning the final progress.
+
+    Records are processed in order on the calling thread unless an executor is provided, in which
+    case they are processed and encoded in batches on its workers. Output order is always preserved.
+
+    When resuming from earlier progress, inputs before ``progress.input_index`` are skipped and the
+    current input is seeked past ``progress.offset`` bytes, which requires file inputs.
+
+    When profiling, a memory snapshot is taken after each input is finished.
+    """
+    progress = progress or Progress()
+    decode = OFFSET_DECODERS[input_format]
+    work: Callable[[tuple[int, Record]], tuple[int, bytes]] = functools.partial(
+        process_and_encode, ENCODERS[output_format]
+    )
+    for index in range(progress.input_index, len(inputs)):
+        with open_input(inputs[index]) as stream:
+            if index != progress.input_index:
+                progress.input_index, progress.offset = index, 0
+            elif progress.offset:
+                stream.seek(progress.offset)
+            base: int = progress.offset
+
+            items: Iterable[tuple[int, Record]] = decode(stream)
+            results: Iterable[tuple[int, bytes]] = (
+                map(work, items) if executor is None else map_ordered(work, items, executor)
+            )
+            for offset, data in results:
+                writer.write(data)
+                progress.offset = base + offset
+                progress.records += 1
+                progress.bytes_written += len(data)
+                if checkpointer is not None:
+                    checkpointer.update(progress, writer)
+        if profiler is not None:
+            profiler.snapshot(f"input {index}: {inputs[index]}")
+    return progress
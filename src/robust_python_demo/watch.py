@@ -0,0 +1,332 @@
+"""Incremental processing of files that appear in a watched directory.
+
+Changes are picked up through Linux inotify where it is available, and by periodically rescanning the
+directory everywhere else. A manifest of content hashes is kept in the user state directory so files
+that were already handled are skipped after a restart. Only files directly inside the directory are
+watched; subdirectories and hidden files are ignored.
+"""
+
+import ctypes
+import ctypes.util
+import dataclasses
+import hashlib
+import json
+import os
+import select
+import struct
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+from typing import Optional
+from typing import Protocol
+
+import platformdirs
+from loguru import logger
+
+from robust_python_demo.checkpoint import APP_NAME
+from robust_python_demo.checkpoint import write_atomic
+from robust_python_demo.exceptions import RecordFormatError
+
+
+DEFAULT_POLL_INTERVAL: float = 2.0
+DEFAULT_SAVE_INTERVAL: float = 30.0
+MANIFEST_VERSION: int = 1
+
+IN_CLOSE_WRITE: int = 0x00000008
+IN_MOVED_TO: int = 0x00000080
+IN_Q_OVERFLOW: int = 0x00004000
+IN_ISDIR: int = 0x40000000
+IN_NONBLOCK: int = 0o4000
+IN_CLOEXEC: int = 0o2000000
+
+_INOTIFY_EVENT: struct.Struct = struct.Struct("iIII")
+_READ_SIZE: int = 1 << 16
+_HASH_CHUNK_SIZE: int = 1 << 20
+
+
+@dataclass(frozen=True)
+class FileState:
+    """The identity of a file's contents as recorded in the manifest."""
+
+    size: int
+    mtime_ns: int
+    sha256: str
+
+
+def default_manifest_dir() -> Path:
+    """Returns the directory watch manifests are stored in, under the user's state directory."""
+    return platformdirs.user_state_path(APP_NAME) / "manifests"
+
+
+def list_files(directory: Path) -> Iterator[Path]:
+    """Yields the regular, non-hidden files directly inside the directory."""
+    for path in directory.iterdir():
+        if not path.name.startswith(".") and path.is_file():
+            yield path
+
+
+def hash_file(path: Path) -> str:
+    """Returns the SHA-256 hex digest of the file's contents."""
+    digest = hashlib.sha256()
+    with path.open("rb") as stream:
+        for chunk in iter(lambda: stream.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """Tracks which files in a watched directory have already been handled.
+
+    Recording a file only updates the manifest in memory. It is saved by ``save``, which
+    ``watch_directory`` calls after each batch of files, and by ``record`` once ``save_interval`` has
+    passed since the last save, so a long batch isn't lost entirely if the process is killed.
+    """
+
+    def __init__(
+        self, directory: Path, manifest_dir: Optional[Path] = None, save_interval: float = DEFAULT_SAVE_INTERVAL
+    ) -> None:
+        """Initializes Manifest, loading any manifest saved for the directory by an earlier run."""
+        key: str = hashlib.sha256(str(directory.resolve()).encode("utf-8")).hexdigest()
+        self.directory: Path = directory
+        self.path: Path = (manifest_dir or default_manifest_dir()) / f"{key}.json"
+        self.save_interval: float = save_interval
+        self.entries: dict[str, FileState] = self._load()
+        self._dirty: bool = False
+        self._last_save: float = time.monotonic()
+
+    def _load(self) -> dict[str, FileState]:
+        """Reads the saved manifest, starting over if it is missing or unreadable."""
+        try:
+            data: dict = json.loads(self.path.read_text(encoding="utf-8"))
+            if data["version"] != MANIFEST_VERSION:
+                raise ValueError(f"unsupported manifest version {data['version']!r}.")
+            return {name: FileState(**entry) for name, entry in data["files"].items()}
+        except FileNotFoundError:
+            return {}
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            logger.warning("Ignoring unreadable manifest {}: {}", self.path, e)
+            return {}
+
+    def changed(self, path: Path) -> Optional[FileState]:
+        """Returns the file's current state if its contents haven't been handled yet, otherwise None.
+
+        Files whose size and modification time match the manifest are skipped without being read.
+        Otherwise the contents are hashed, so a file that was merely touched isn't reprocessed.
+        """
+        stat: os.stat_result = path.stat()
+        entry: Optional[FileState] = self.entries.get(path.name)
+        if entry is not None and (entry.size, entry.mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+            return None
+
+        state: FileState = FileState(stat.st_size, stat.st_mtime_ns, hash_file(path))
+        if entry is not None and entry.sha256 == state.sha256:
+            self.record(path, state)
+            return None
+        return state
+
+    def record(self, path: Path, state: FileState) -> None:
+        """Records the file as handled, saving the manifest if the save interval has passed."""
+        self.entries[path.name] = state
+        self._dirty = True
+        if time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
+
+    def save(self) -> None:
+        """Atomically saves the manifest if anything was recorded since the last save.
+
+        Entries for files that are no longer in the directory are dropped first.
+        """
+        if not self._dirty:
+            return
+        present: set[str] = {path.name for path in list_files(self.directory)}
+        self.entries = {name: entry for name, entry in self.entries.items() if name in present}
+        files: dict[str, dict] = {name: dataclasses.asdict(entry) for name, entry in self.entries.items()}
+        write_atomic(self.path, json.dumps({"version": MANIFEST_VERSION, "files": files}))
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+
+class Watcher(Protocol):
+    """Waits for files in a directory to be created or changed."""
+
+    def wait(self) -> set[Path]:
+        """Blocks until files change or a timeout passes, returning the files that are ready."""
+        ...
+
+    def close(self) -> None:
+        """Releases any resources held by the watcher."""
+        ...
+
+
+class InotifyWatcher:
+    """Watches a directory through Linux inotify, reporting files once they are closed or moved in."""
+
+    def __init__(self, directory: Path, timeout: Optional[float] = None) -> None:
+        """Initializes InotifyWatcher.
+
+        Raises:
+            OSError: If inotify isn't available on this platform or the watch can't be added.
+        """
+        self.directory: Path = directory
+        self.timeout: Optional[float] = timeout
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            inotify_init1 = libc.inotify_init1
+            inotify_add_watch = libc.inotify_add_watch
+        except (AttributeError, OSError, TypeError) as e:
+            raise OSError("inotify is not available on this platform.") from e
+
+        self._fd: int = inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if inotify_add_watch(self._fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            errno: int = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, "inotify_add_watch failed", str(directory))
+
+    def wait(self) -> set[Path]:
+        """Returns the files that were closed after writing or moved into the directory."""
+        readable, _, _ = select.select([self._fd], [], [], self.timeout)
+        if not readable:
+            return set()
+
+        names, overflowed = _parse_events(os.read(self._fd, _READ_SIZE))
+        if overflowed:
+            return set(list_files(self.directory))
+        return {self.directory / name for name in names}
+
+    def close(self) -> None:
+        """Closes the inotify file descriptor."""
+        os.close(self._fd)
+
+
+def _parse_events(data: bytes) -> tuple[set[str], bool]:
+    """Returns the non-hidden file names in a buffer of inotify events, and whether the event queue overflowed.
+
+    Events for directories, such as one being moved into the watched directory, are skipped.
+    """
+    names: set[str] = set()
+    offset: int = 0
+    while offset < len(data):
+        _, mask, _, name_length = _INOTIFY_EVENT.unpack_from(data, offset)
+        offset += _INOTIFY_EVENT.size
+        name: str = os.fsdecode(data[offset : offset + name_length].rstrip(b"\0"))
+        offset += name_length
+        if mask & IN_Q_OVERFLOW:
+            return set(), True
+        if name and not name.startswith(".") and not mask & IN_ISDIR:
+            names.add(name)
+    return names, False
+
+
+class PollingWatcher:
+    """Watches a directory by rescanning it, reporting files once they stop changing between scans."""
+
+    def __init__(self, directory: Path, interval: float = DEFAULT_POLL_INTERVAL) -> None:
+        """Initializes PollingWatcher."""
+        self.directory: Path = directory
+        self.interval: float = interval
+        self._snapshot: dict[Path, tuple[int, int]] = self._scan()
+        self._settling: set[Path] = set()
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        """Returns the size and modification time of every file in the directory."""
+        snapshot: dict[Path, tuple[int, int]] = {}
+        for path in list_files(self.directory):
+            try:
+                stat: os.stat_result = path.stat()
+            except FileNotFoundError:
+                continue
+            snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def wait(self) -> set[Path]:
+        """Sleeps for the poll interval, then returns files that changed and have since settled."""
+        time.sleep(self.interval)
+        snapshot: dict[Path, tuple[int, int]] = self._scan()
+        ready: set[Path] = set()
+        for path, state in snapshot.items():
+            if state != self._snapshot.get(path):
+                self._settling.add(path)
+            elif path in self._settling:
+                self._settling.discard(path)
+                ready.add(path)
+        self._settling &= snapshot.keys()
+        self._snapshot = snapshot
+        return ready
+
+    def close(self) -> None:
+        """Nothing to release for the polling watcher."""
+
+
+def create_watcher(directory: Path, poll_interval: float = DEFAULT_POLL_INTERVAL) -> Watcher:
+    """Creates an inotify watcher, falling back to polling where inotify isn't available."""
+    try:
+        return InotifyWatcher(directory, timeout=poll_interval)
+    except OSError as e:
+        logger.info("Falling back to polling {} every {}s: {}", directory, poll_interval, e)
+        return PollingWatcher(directory, interval=poll_interval)
+
+
+def watch_directory(
+    directory: Path,
+    handle: Callable[[Path], None],
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    manifest: Optional[Manifest] = None,
+    watcher: Optional[Watcher] = None,
+    stop: Callable[[], bool] = lambda: False,
+) -> None:
+    """Handles every unprocessed file in the directory, then keeps handling files as they change.
+
+    The watcher is started before the initial scan so files arriving during it aren't missed. Files
+    that fail to decode are logged and recorded like any other, so they're only retried once their
+    contents change. Files that vanish or can't be read are logged and skipped without being recorded,
+    so they're picked up again once they reappear. The manifest is saved once after each batch of files rather than after every file.
+
+    Args:
+        directory: Directory to watch.
+        handle: Called with each new or changed file.
+        poll_interval: Seconds between rescans when polling, or between stop checks with inotify.
+        manifest: Manifest of handled files. Defaults to the one saved for the directory.
+        watcher: Watcher to wait on. Defaults to inotify with a polling fallback.
+        stop: Checked after each batch of files; watching ends once it returns True.
+    """
+    manifest = manifest or Manifest(directory)
+    watcher = watcher or create_watcher(directory, poll_interval)
+    try:
+        candidates: set[Path] = set(list_files(directory))
+        while True:
+            try:
+                for path in sorted(candidates):
+                    _handle_if_changed(path, handle, manifest)
+            finally:
+                manifest.save()
+            if stop():
+                return
+            candidates = watcher.wait()
+    finally:
+        watcher.close()
+
+
+def _handle_if_changed(path: Path, handle: Callable[[Path], None], manifest: Manifest) -> None:
+    """Handles the file if its contents aren't in the manifest yet, then records it."""
+    try:
+        state: Optional[FileState] = manifest.changed(path)
+    except OSError as e:
+        logger.warning("Skipping {}: {}", path, e)
+        return
+    if state is None:
+        return
+
+    try:
+        handle(path)
+    except RecordFormatError as e:
+        logger.error("Skipping {}: {}", path, e)
+    except BrokenPipeError:
+        raise
+    except OSError as e:
+        logger.warning("Skipping {}: {}", path, e)
+        return
+    manifest.record(path, state)
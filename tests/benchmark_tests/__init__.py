@@ -0,0 +1 @@
+"""Benchmarks for the robust_python_demo package."""
@@ -0,0 +1,45 @@
+"""Fixtures used in benchmarks."""
+
+import time
+from typing import Callable
+
+import pytest
+
+
+BenchmarkRunner = Callable[[str, Callable[[], object], int, int], float]
+
+RESULTS: list[tuple[str, float, int, int]] = []
+
+
+@pytest.fixture
+def benchmark(record_property: Callable[[str, object], None]) -> BenchmarkRunner:
+    """Fixture that times a callable, keeping the best of several rounds.
+
+    The runner takes a label, the callable, and the number of records and bytes it handles per call.
+    Results are recorded as junit properties and summarized at the end of the session.
+    """
+
+    def run(label: str, func: Callable[[], object], records: int, size: int, rounds: int = 5) -> float:
+        best: float = float("inf")
+        for _ in range(rounds):
+            start: float = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        record_property("best_seconds", best)
+        record_property("records_per_second", records / best)
+        record_property("megabytes_per_second", size / best / 1e6)
+        RESULTS.append((label, best, records, size))
+        return best
+
+    return run
+
+
+def pytest_terminal_summary(terminalreporter: pytest.TerminalReporter) -> None:
+    """Prints a throughput table for every benchmark that ran."""
+    if not RESULTS:
+        return
+    terminalreporter.section("benchmarks")
+    terminalreporter.write_line(f"{'benchmark':<24}{'best (ms)':>12}{'records/s':>16}{'MB/s':>10}")
+    for label, best, records, size in RESULTS:
+        throughput: str = f"{size / best / 1e6:.1f}" if size else "-"
+        terminalreporter.write_line(f"{label:<24}{best * 1e3:>12.2f}{records / best:>16,.0f}{throughput:>10}")
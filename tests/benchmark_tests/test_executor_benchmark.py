@@ -0,0 +1,38 @@
+"""Benchmarks measuring how record processing scales across execution backends."""
+
+import os
+
+import pytest
+
+from robust_python_demo.executor import Backend
+from robust_python_demo.executor import create_executor
+from robust_python_demo.executor import map_ordered
+from robust_python_demo.executor import resolve_backend
+from tests.benchmark_tests.conftest import BenchmarkRunner
+
+
+ITEM_COUNT: int = 2_000
+WORKERS: int = min(4, os.cpu_count() or 1)
+
+
+def cpu_bound(seed: int) -> int:
+    """Burns a small, fixed amount of CPU per item. Module level so it can be pickled."""
+    total: int = seed
+    for value in range(2_000):
+        total = (total * 31 + value) % 1_000_003
+    return total
+
+
+def test_serial_throughput(benchmark: BenchmarkRunner) -> None:
+    """Measures the single-threaded baseline."""
+    benchmark("serial", lambda: [cpu_bound(seed) for seed in range(ITEM_COUNT)], ITEM_COUNT, 0)
+
+
+@pytest.mark.parametrize("backend", [Backend.THREAD, Backend.PROCESS])
+def test_pool_throughput(benchmark: BenchmarkRunner, backend: Backend) -> None:
+    """Measures throughput on each pool. Threads only scale on free-threaded builds."""
+    expected = [cpu_bound(seed) for seed in range(ITEM_COUNT)]
+    with create_executor(backend, WORKERS) as pool:
+        label = f"{backend.value} ({resolve_backend(backend).value}) x{WORKERS}"
+        benchmark(label, lambda: list(map_ordered(cpu_bound, range(ITEM_COUNT), pool, batch_size=64)), ITEM_COUNT, 0)
+        assert list(map_ordered(cpu_bound, range(ITEM_COUNT), pool, batch_size=64)) == expected
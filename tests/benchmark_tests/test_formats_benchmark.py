@@ -0,0 +1,50 @@
+"""Benchmarks comparing the NDJSON and binary record formats."""
+
+import io
+
+import pytest
+
+from robust_python_demo.formats import DECODERS
+from robust_python_demo.formats import ENCODERS
+from robust_python_demo.formats import Record
+from robust_python_demo.formats import RecordFormat
+from tests.benchmark_tests.conftest import BenchmarkRunner
+
+
+RECORD_COUNT: int = 20_000
+
+
+@pytest.fixture(scope="module")
+def records() -> list[Record]:
+    """Fixture providing a batch of representative flat records."""
+    return [
+        {
+            "id": n,
+            "name": f"record-{n}",
+            "score": n / 7,
+            "active": n % 2 == 0,
+            "parent": None if n % 3 else n - 1,
+            "description": "lorem ipsum dolor sit amet " * 2,
+        }
+        for n in range(RECORD_COUNT)
+    ]
+
+
+@pytest.mark.parametrize("record_format", list(RecordFormat))
+def test_encode_throughput(benchmark: BenchmarkRunner, records: list[Record], record_format: RecordFormat) -> None:
+    """Measures how quickly records are encoded."""
+    encode = ENCODERS[record_format]
+    size = sum(len(encode(record)) for record in records)
+
+    benchmark(f"encode-{record_format.value}", lambda: [encode(record) for record in records], len(records), size)
+
+
+@pytest.mark.parametrize("record_format", list(RecordFormat))
+def test_decode_throughput(benchmark: BenchmarkRunner, records: list[Record], record_format: RecordFormat) -> None:
+    """Measures how quickly an encoded stream is decoded back into records."""
+    encode = ENCODERS[record_format]
+    decode = DECODERS[record_format]
+    data = b"".join(encode(record) for record in records)
+
+    benchmark(f"decode-{record_format.value}", lambda: list(decode(io.BytesIO(data))), len(records), len(data))
+    assert list(decode(io.BytesIO(data))) == records
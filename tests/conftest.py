@@ -1 +1,24 @@
 """Fixtures used in all tests."""
+
+from pathlib import Path
+
+import pytest
+
+from robust_python_demo import checkpoint
+from robust_python_demo import watch
+
+
+@pytest.fixture(autouse=True)
+def checkpoint_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Fixture keeping checkpoints out of the real user state directory."""
+    directory: Path = tmp_path / "checkpoints"
+    monkeypatch.setattr(checkpoint, "default_checkpoint_dir", lambda: directory)
+    return directory
+
+
+@pytest.fixture(autouse=True)
+def manifest_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Fixture keeping watch manifests out of the real user state directory."""
+    directory: Path = tmp_path / "manifests"
+    monkeypatch.setattr(watch, "default_manifest_dir", lambda: directory)
+    return directory
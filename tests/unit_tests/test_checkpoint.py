@@ -0,0 +1,116 @@
+"""Test cases for the checkpoint module."""
+
+import os
+from pathlib import Path
+
+import platformdirs
+import pytest
+
+from robust_python_demo.checkpoint import APP_NAME
+from robust_python_demo.checkpoint import Checkpointer
+from robust_python_demo.checkpoint import CheckpointStore
+from robust_python_demo.checkpoint import Progress
+from robust_python_demo.checkpoint import default_checkpoint_dir
+from robust_python_demo.checkpoint import input_key
+from robust_python_demo.formats import RecordFormat
+from robust_python_demo.output import BinaryStdoutWriter
+
+
+@pytest.fixture
+def store(checkpoint_dir: Path) -> CheckpointStore:
+    """Fixture providing a store in the isolated checkpoint directory."""
+    return CheckpointStore("abc123")
+
+
+def test_default_checkpoint_dir_is_in_user_state_dir() -> None:
+    """It keeps checkpoints under the platform's user state directory."""
+    assert default_checkpoint_dir().parent == platformdirs.user_state_path(APP_NAME)
+
+
+def test_input_key_tracks_identity(tmp_path: Path) -> None:
+    """It changes when the inputs, their contents or the input format change."""
+    path = tmp_path / "input.ndjson"
+    path.write_bytes(b'{"a":1}\n')
+    key = input_key([path], RecordFormat.NDJSON)
+
+    assert input_key([path], RecordFormat.NDJSON) == key
+    assert input_key([path], RecordFormat.BINARY) != key
+    assert input_key([path, path], RecordFormat.NDJSON) != key
+
+    path.write_bytes(b'{"a":1}\n{"b":2}\n')
+    assert input_key([path], RecordFormat.NDJSON) != key
+
+
+def test_store_round_trip(store: CheckpointStore, checkpoint_dir: Path) -> None:
+    """It saves progress into the checkpoint directory and loads it back."""
+    progress = Progress(input_index=2, offset=128, records=10, bytes_written=512)
+    store.save(progress)
+
+    assert store.path.parent == checkpoint_dir
+    assert store.load() == progress
+
+
+def test_store_load_missing(store: CheckpointStore) -> None:
+    """It returns None when no checkpoint has been written."""
+    assert store.load() is None
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "{not json",
+        "[]",
+        '{"version": 1, "key": "other", "input_index": 0, "offset": 0, "records": 0, "bytes_written": 0}',
+        '{"version": 1, "key": "abc123", "unexpected": 0}',
+        '{"key": "abc123"}',
+    ],
+)
+def test_store_ignores_unusable_checkpoints(store: CheckpointStore, content: str) -> None:
+    """It ignores corrupt checkpoints and ones written for other inputs."""
+    store.path.parent.mkdir(parents=True)
+    store.path.write_text(content)
+    assert store.load() is None
+
+
+def test_failed_save_keeps_previous_checkpoint(store: CheckpointStore, monkeypatch: pytest.MonkeyPatch) -> None:
+    """It leaves the previous checkpoint intact and no temporary files behind when a save fails."""
+    store.save(Progress(records=1))
+
+    def fail(_: int) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "fsync", fail)
+    with pytest.raises(OSError, match="disk full"):
+        store.save(Progress(records=2))
+
+    assert store.load() == Progress(records=1)
+    assert list(store.path.parent.iterdir()) == [store.path]
+
+
+def test_store_clear(store: CheckpointStore) -> None:
+    """It removes the checkpoint and tolerates there being none."""
+    store.save(Progress())
+    store.clear()
+    store.clear()
+    assert not store.path.exists()
+
+
+def test_checkpointer_saves_on_interval(store: CheckpointStore) -> None:
+    """It flushes output and saves only once the interval has elapsed."""
+    now = [0.0]
+    read_fd, write_fd = os.pipe()
+    checkpointer = Checkpointer(store, interval=10, clock=lambda: now[0])
+    try:
+        with BinaryStdoutWriter(fd=write_fd) as writer:
+            writer.write(b"x")
+            now[0] = 5
+            checkpointer.update(Progress(records=1), writer)
+            assert store.load() is None
+
+            now[0] = 10
+            checkpointer.update(Progress(records=2), writer)
+            assert store.load() == Progress(records=2)
+            assert os.read(read_fd, 1) == b"x"
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
@@ -0,0 +1,77 @@
+"""Test cases for the executor module."""
+
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from robust_python_demo import executor
+from robust_python_demo.executor import Backend
+from robust_python_demo.executor import create_executor
+from robust_python_demo.executor import map_ordered
+from robust_python_demo.executor import resolve_backend
+
+
+def square(value: int) -> int:
+    """Module level function so it can be pickled for the process pool."""
+    return value * value
+
+
+@pytest.fixture(params=[True, False], ids=["free-threaded", "gil"])
+def free_threaded(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> bool:
+    """Fixture pretending to run on a free-threaded or GIL build."""
+    monkeypatch.setattr(sys, "_is_gil_enabled", lambda: not request.param, raising=False)
+    return request.param
+
+
+def test_is_free_threaded_without_gil_check(monkeypatch: pytest.MonkeyPatch) -> None:
+    """It reports a GIL build on interpreters that predate sys._is_gil_enabled."""
+    monkeypatch.delattr(sys, "_is_gil_enabled", raising=False)
+    assert not executor.is_free_threaded()
+
+
+@pytest.mark.parametrize("backend", [Backend.AUTO, Backend.THREAD])
+def test_resolve_backend_prefers_threads_without_gil(backend: Backend, free_threaded: bool) -> None:
+    """It uses threads only when the GIL is disabled and otherwise falls back to processes."""
+    expected = Backend.THREAD if free_threaded else Backend.PROCESS
+    assert resolve_backend(backend) is expected
+
+
+def test_resolve_backend_honours_process(free_threaded: bool) -> None:
+    """It always uses the process pool when asked to."""
+    assert resolve_backend(Backend.PROCESS) is Backend.PROCESS
+
+
+def test_create_executor_matches_backend(free_threaded: bool) -> None:
+    """It creates a thread pool on free-threaded builds and a process pool otherwise."""
+    with create_executor(Backend.AUTO, workers=2) as pool:
+        assert isinstance(pool, ThreadPoolExecutor if free_threaded else ProcessPoolExecutor)
+
+
+def test_map_ordered_preserves_order_across_threads() -> None:
+    """It yields every result in input order even when batches finish out of order."""
+    seen_threads: set[int] = set()
+
+    def record_thread(value: int) -> int:
+        seen_threads.add(threading.get_ident())
+        return square(value)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(map_ordered(record_thread, range(1000), pool, batch_size=7, max_pending=3))
+
+    assert results == [square(value) for value in range(1000)]
+    assert seen_threads
+
+
+def test_map_ordered_with_process_pool() -> None:
+    """It maps picklable functions across worker processes."""
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        assert list(map_ordered(square, range(50), pool, batch_size=8)) == [square(value) for value in range(50)]
+
+
+def test_map_ordered_handles_empty_input() -> None:
+    """It yields nothing for empty input."""
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        assert list(map_ordered(square, [], pool)) == []
@@ -0,0 +1,160 @@
+"""Test cases for the formats module."""
+
+import io
+import itertools
+import json
+from typing import Optional
+
+import pytest
+
+from robust_python_demo import formats
+from robust_python_demo.exceptions import RecordFormatError
+from robust_python_demo.formats import DECODERS
+from robust_python_demo.formats import ENCODERS
+from robust_python_demo.formats import OFFSET_DECODERS
+from robust_python_demo.formats import Record
+from robust_python_demo.formats import RecordFormat
+from robust_python_demo.formats import encode_binary
+from robust_python_demo.formats import iter_binary
+from robust_python_demo.formats import iter_binary_offsets
+from robust_python_demo.formats import iter_ndjson
+
+
+RECORDS: list[Record] = [
+    {},
+    {"id": 1, "name": "alpha", "score": 0.5, "active": True, "deleted": False, "parent": None},
+    {"unicode": "héllo ✓", "big": 1 << 70, "negative": -(1 << 63), "tags": ["a", "b"], "meta": {"k": [1, 2.5]}},
+]
+
+
+@pytest.mark.parametrize("record_format", list(RecordFormat))
+def test_round_trip(record_format: RecordFormat) -> None:
+    """It decodes exactly the records it encoded."""
+    data = b"".join(ENCODERS[record_format](record) for record in RECORDS)
+    assert list(DECODERS[record_format](io.BytesIO(data))) == RECORDS
+
+
+def test_binary_round_trip_with_lone_surrogates() -> None:
+    """It round trips keys and strings holding lone surrogates, which valid JSON can decode to."""
+    record: Record = json.loads('{"\\udc00": "\\ud800", "nested": ["\\udfff"]}')
+    assert list(iter_binary(io.BytesIO(encode_binary(record)))) == [record]
+
+
+def test_iter_binary_handles_frames_split_across_chunks() -> None:
+    """It reassembles frames that straddle chunk boundaries, including frames larger than a chunk."""
+    records: list[Record] = [{"n": n, "text": "x" * (n * 7)} for n in range(20)]
+    data = b"".join(encode_binary(record) for record in records)
+    assert list(iter_binary(io.BytesIO(data), chunk_size=5)) == records
+
+
+def test_iter_binary_rejects_truncated_input() -> None:
+    """It raises once the input ends partway through a frame."""
+    data = encode_binary({"id": 1})
+    with pytest.raises(RecordFormatError, match="truncated"):
+        list(iter_binary(io.BytesIO(data[:-1])))
+
+
+def test_iter_binary_rejects_unknown_tag() -> None:
+    """It raises on a type tag it doesn't know."""
+    data = bytearray(encode_binary({"k": None}))
+    data[12] = ord("?")
+    with pytest.raises(RecordFormatError, match="unknown type tag"):
+        list(iter_binary(io.BytesIO(bytes(data))))
+
+
+def test_iter_binary_rejects_schema_length_mismatch() -> None:
+    """It raises when a schema's keys don't fill exactly its declared length."""
+    data = bytearray(encode_binary({"k": None, "other": 1}))
+    data[10] = 4
+    with pytest.raises(RecordFormatError, match="schema length"):
+        list(iter_binary(io.BytesIO(bytes(data))))
+
+
+def test_iter_binary_rejects_frame_length_mismatch() -> None:
+    """It raises when a frame's fields don't fill exactly the declared length."""
+    data = encode_binary({"k": None}) + b"extra"
+    data = (len(data) - 4).to_bytes(4, "little") + data[4:]
+    with pytest.raises(RecordFormatError, match="frame length"):
+        list(iter_binary(io.BytesIO(data)))
+
+
+def test_binary_round_trip_when_schema_caches_fill(monkeypatch: pytest.MonkeyPatch) -> None:
+    """It keeps decoding correctly once the schema caches are full and get cleared."""
+    monkeypatch.setattr(formats, "_MAX_SCHEMAS", 1)
+    monkeypatch.setattr(formats, "_SCHEMAS", {})
+    monkeypatch.setattr(formats, "_LAYOUTS", {})
+    data = b"".join(encode_binary(record) for record in RECORDS * 2)
+    assert list(iter_binary(io.BytesIO(data))) == RECORDS * 2
+
+
+class TrickleStream(io.BytesIO):
+    """A stream whose read1 returns the given number of bytes per call and fails where a pipe would block."""
+
+    def __init__(self, data: bytes, sizes: list[int]) -> None:
+        """Initializes the stream with its data and the number of bytes each read1 call returns."""
+        super().__init__(data)
+        self.sizes: list[int] = sizes
+
+    def read1(self, size: Optional[int] = -1) -> bytes:
+        """Returns the next scripted number of bytes, at most size, or fails if none are left."""
+        if not self.sizes:
+            raise AssertionError("read would block")
+        count: int = self.sizes.pop(0)
+        return self.read(count if size is None or size < 0 else min(count, size))
+
+
+def test_iter_binary_yields_records_without_waiting_for_a_full_chunk() -> None:
+    """It yields each record as soon as its frame has arrived, instead of blocking to fill a chunk."""
+    frames = [encode_binary(record) for record in RECORDS]
+    records = iter_binary(TrickleStream(b"".join(frames), [len(frame) for frame in frames]))
+    assert [next(records) for _ in RECORDS] == RECORDS
+
+
+def test_iter_binary_reads_the_rest_of_a_large_frame_at_once() -> None:
+    """It reads the remainder of a frame larger than a chunk with a single read."""
+    records = iter_binary(TrickleStream(encode_binary({"text": "x" * 100}), [10]), chunk_size=16)
+    assert next(records) == {"text": "x" * 100}
+
+
+def test_encode_binary_rejects_oversized_keys() -> None:
+    """It raises when a key doesn't fit in the key length prefix."""
+    with pytest.raises(RecordFormatError, match="keys are limited"):
+        encode_binary({"k" * (1 << 16): 1})
+
+
+def test_encode_binary_rejects_too_many_fields() -> None:
+    """It raises when the record has more fields than the field count prefix allows."""
+    with pytest.raises(RecordFormatError, match="fields"):
+        encode_binary({str(n): n for n in range(1 << 16)})
+
+
+def test_iter_ndjson_skips_blank_lines() -> None:
+    """It ignores empty and whitespace-only lines."""
+    assert list(iter_ndjson(io.BytesIO(b'\n{"a":1}\n  \n{"b":2}\n'))) == [{"a": 1}, {"b": 2}]
+
+
+@pytest.mark.parametrize(("data", "match"), [(b"{nope}\n", "line 1"), (b'{"a":1}\n[1]\n', "expected a JSON object")])
+def test_iter_ndjson_rejects_invalid_lines(data: bytes, match: str) -> None:
+    """It raises with the offending line number on malformed or non-object lines."""
+    with pytest.raises(RecordFormatError, match=match):
+        list(iter_ndjson(io.BytesIO(data)))
+
+
+@pytest.mark.parametrize("record_format", list(RecordFormat))
+def test_offsets_point_past_each_record(record_format: RecordFormat) -> None:
+    """It reports offsets that resume decoding exactly after the corresponding record."""
+    encode = ENCODERS[record_format]
+    data = b"".join(encode(record) for record in RECORDS)
+    offsets = [offset for offset, _ in OFFSET_DECODERS[record_format](io.BytesIO(data))]
+
+    assert offsets[-1] == len(data)
+    for index, offset in enumerate(offsets):
+        assert list(DECODERS[record_format](io.BytesIO(data[offset:]))) == RECORDS[index + 1 :]
+
+
+def test_binary_offsets_across_chunks() -> None:
+    """It tracks offsets correctly when frames straddle chunk boundaries."""
+    records: list[Record] = [{"n": n, "text": "x" * n} for n in range(30)]
+    frames = [encode_binary(record) for record in records]
+    offsets = [offset for offset, _ in iter_binary_offsets(io.BytesIO(b"".join(frames)), chunk_size=7)]
+    assert offsets == list(itertools.accumulate(len(frame) for frame in frames))
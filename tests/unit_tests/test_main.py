@@ -1,18 +1,201 @@
 """Test cases for the __main__ module."""
 
+import inspect
+import json
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
 import pytest
+import typer
 from typer.testing import CliRunner
 
 from robust_python_demo import __main__
+from robust_python_demo import watch
+from robust_python_demo.checkpoint import CheckpointStore
+from robust_python_demo.checkpoint import Progress
+from robust_python_demo.checkpoint import input_key
+from robust_python_demo.formats import RecordFormat
+from robust_python_demo.formats import encode_binary
 
 
 @pytest.fixture
 def runner() -> CliRunner:
-    """Fixture for invoking command-line interfaces."""
-    return CliRunner()
+    """Fixture for invoking command-line interfaces, capturing stderr apart from stdout.
+
+    Click 8.2 always captures them separately and dropped ``mix_stderr``, while older versions mix them
+    unless it's turned off.
+    """
+    options: dict[str, Any] = {"mix_stderr": False} if "mix_stderr" in inspect.signature(CliRunner).parameters else {}
+    return CliRunner(**options)
 
 
 def test_main_succeeds(runner: CliRunner) -> None:
     """It exits with a status code of zero."""
     result = runner.invoke(__main__.app)
     assert result.exit_code == 0
+
+
+def test_main_passes_ndjson_through(runner: CliRunner) -> None:
+    """It echoes NDJSON records from stdin in compact form."""
+    result = runner.invoke(__main__.app, input='{"a": 1}\n{"b": [2]}\n')
+    assert result.exit_code == 0
+    assert result.stdout == '{"a":1}\n{"b":[2]}\n'
+
+
+def test_main_converts_between_formats(runner: CliRunner, tmp_path: Path) -> None:
+    """It reads binary records from files and writes them back out as NDJSON."""
+    first = tmp_path / "first.bin"
+    second = tmp_path / "second.bin"
+    first.write_bytes(encode_binary({"a": 1}))
+    second.write_bytes(encode_binary({"b": "two"}))
+
+    result = runner.invoke(__main__.app, [str(first), str(second), "--input-format", "binary"])
+    assert result.exit_code == 0
+    assert result.stdout == '{"a":1}\n{"b":"two"}\n'
+
+
+def test_main_writes_binary(runner: CliRunner) -> None:
+    """It writes length-prefixed frames when asked for binary output."""
+    result = runner.invoke(__main__.app, ["--output-format", "binary"], input='{"a": 1}\n')
+    assert result.exit_code == 0
+    assert result.stdout_bytes == encode_binary({"a": 1})
+
+
+def test_main_reports_invalid_input(runner: CliRunner) -> None:
+    """It exits non-zero and reports malformed input on stderr."""
+    result = runner.invoke(__main__.app, input="not json\n")
+    assert result.exit_code == 1
+    assert "Invalid ndjson input" in result.stderr
+
+
+def test_main_exits_quietly_on_broken_pipe(runner: CliRunner, monkeypatch: pytest.MonkeyPatch) -> None:
+    """It exits with a status of one and no traceback when stdout is closed."""
+
+    def broken_write(*_: object) -> None:
+        raise BrokenPipeError
+
+    monkeypatch.setattr(__main__.BinaryStdoutWriter, "write", broken_write)
+    result = runner.invoke(__main__.app, input='{"a": 1}\n')
+    assert result.exit_code == 1
+    assert not isinstance(result.exception, BrokenPipeError)
+
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_main_processes_records_in_parallel(runner: CliRunner, backend: str) -> None:
+    """It preserves record order when processing on a worker pool."""
+    lines = "".join(f'{{"n":{n}}}\n' for n in range(2000))
+    result = runner.invoke(__main__.app, ["--jobs", "2", "--backend", backend], input=lines)
+    assert result.exit_code == 0
+    assert result.stdout == lines
+
+
+def test_main_resumes_from_checkpoint(runner: CliRunner, tmp_path: Path) -> None:
+    """It skips input covered by the checkpoint and clears it once the run completes."""
+    first = tmp_path / "first.ndjson"
+    second = tmp_path / "second.ndjson"
+    first.write_text('{"n":1}\n')
+    second.write_text('{"n":2}\n{"n":3}\n')
+    store = CheckpointStore(input_key([first, second], RecordFormat.NDJSON))
+    store.save(Progress(input_index=1, offset=len('{"n":2}\n'), records=2))
+
+    result = runner.invoke(__main__.app, [str(first), str(second), "--resume"])
+    assert result.exit_code == 0
+    assert result.stdout == '{"n":3}\n'
+    assert store.load() is None
+
+
+def test_main_ignores_checkpoint_without_resume(runner: CliRunner, tmp_path: Path) -> None:
+    """It processes everything when --resume isn't given."""
+    path = tmp_path / "input.ndjson"
+    path.write_text('{"n":1}\n{"n":2}\n')
+    CheckpointStore(input_key([path], RecordFormat.NDJSON)).save(Progress(offset=8, records=1))
+
+    result = runner.invoke(__main__.app, [str(path), "--checkpoint-interval", "0"])
+    assert result.exit_code == 0
+    assert result.stdout == '{"n":1}\n{"n":2}\n'
+
+
+def test_main_keeps_checkpoint_after_failure(runner: CliRunner, tmp_path: Path) -> None:
+    """It leaves checkpoints written before a failure in place for the next --resume."""
+    path = tmp_path / "input.ndjson"
+    path.write_text('{"n":1}\n{"n":2}\nbroken\n')
+
+    result = runner.invoke(__main__.app, [str(path), "--checkpoint-interval", "0.000001"])
+    assert result.exit_code == 1
+    assert CheckpointStore(input_key([path], RecordFormat.NDJSON)).load() == Progress(
+        offset=16, records=2, bytes_written=16
+    )
+
+
+def test_main_rejects_missing_input(runner: CliRunner, tmp_path: Path) -> None:
+    """It reports an input file that doesn't exist as a usage error instead of a traceback."""
+    result = runner.invoke(__main__.app, [str(tmp_path / "missing.ndjson")])
+    assert result.exit_code == 2
+    assert "does not exist" in result.stderr
+
+
+def test_main_reads_stdin_for_dash(runner: CliRunner) -> None:
+    """It treats '-' as stdin rather than a missing file."""
+    result = runner.invoke(__main__.app, ["-"], input='{"a": 1}\n')
+    assert result.exit_code == 0
+    assert result.stdout == '{"a":1}\n'
+
+
+def test_main_rejects_resume_from_stdin(runner: CliRunner) -> None:
+    """It refuses to resume when reading stdin, which has no stable identity."""
+    result = runner.invoke(__main__.app, ["--resume"])
+    assert result.exit_code == 2
+
+
+def test_main_watches_directory(runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """It processes files already in the watched directory and exits cleanly when interrupted."""
+    (tmp_path / "a.ndjson").write_text('{"n":1}\n')
+    (tmp_path / "b.ndjson").write_text('{"n":2}\n')
+
+    class InterruptingWatcher:
+        def wait(self) -> set[Path]:
+            raise KeyboardInterrupt
+
+        def close(self) -> None:
+            pass
+
+    monkeypatch.setattr(watch, "create_watcher", lambda *_: InterruptingWatcher())
+    result = runner.invoke(__main__.app, ["--watch", str(tmp_path)])
+    assert result.exit_code == 0
+    assert result.stdout == '{"n":1}\n{"n":2}\n'
+
+
+def test_main_rejects_watch_with_inputs(runner: CliRunner, tmp_path: Path) -> None:
+    """It refuses to combine --watch with input files."""
+    path = tmp_path / "a.ndjson"
+    path.write_text('{"n":1}\n')
+    result = runner.invoke(__main__.app, [str(path), "--watch", str(tmp_path)])
+    assert result.exit_code == 2
+    assert "--watch" in result.stderr
+
+
+def test_main_writes_memory_profile(runner: CliRunner, tmp_path: Path) -> None:
+    """It snapshots memory after each input and writes the report when the command exits."""
+    path = tmp_path / "input.ndjson"
+    path.write_text('{"n":1}\n')
+    report_path = tmp_path / "memprofile.json"
+
+    result = runner.invoke(__main__.app, [str(path), str(path), "--memprofile", str(report_path)])
+    assert result.exit_code == 0
+    report = json.loads(report_path.read_text())
+    assert [snapshot["label"] for snapshot in report["snapshots"]] == [
+        "start",
+        f"input 0: {path}",
+        f"input 1: {path}",
+        "end",
+    ]
+    assert not tracemalloc.is_tracing()
+
+
+def test_main_skips_memory_profile_while_completing(tmp_path: Path) -> None:
+    """It doesn't start profiling while parsing for shell completion."""
+    ctx = typer.Context(typer.main.get_command(__main__.app), resilient_parsing=True)
+    path = tmp_path / "memprofile.json"
+    assert __main__.start_memory_profiler(ctx, path) == path
+    assert __main__.MEMORY_PROFILER_KEY not in ctx.meta
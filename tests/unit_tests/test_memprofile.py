@@ -0,0 +1,64 @@
+"""Test cases for the memprofile module."""
+
+import json
+import tracemalloc
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from robust_python_demo.memprofile import MemoryProfiler
+
+
+@pytest.fixture(autouse=True)
+def stop_tracing() -> Iterator[None]:
+    """Fixture making sure tracing never leaks out of a test."""
+    yield
+    tracemalloc.stop()
+
+
+def test_memory_profiler_writes_report(tmp_path: Path) -> None:
+    """It reports every snapshot, diffs between consecutive ones and the overall peak."""
+    path = tmp_path / "memprofile.json"
+    profiler = MemoryProfiler(path, limit=5)
+    profiler.start()
+    retained = [bytearray(1 << 16) for _ in range(16)]
+    profiler.snapshot("allocated")
+    del retained
+    profiler.stop()
+
+    report = json.loads(path.read_text())
+    assert [snapshot["label"] for snapshot in report["snapshots"]] == ["start", "allocated", "end"]
+    assert [(diff["from"], diff["to"]) for diff in report["diffs"]] == [("start", "allocated"), ("allocated", "end")]
+    assert all(len(snapshot["top"]) <= 5 for snapshot in report["snapshots"])
+    assert report["peak_bytes"] >= 16 << 16
+
+    growth = report["diffs"][0]["top"][0]
+    assert growth["file"] == __file__
+    assert growth["size_diff_bytes"] >= 16 << 16
+    assert not tracemalloc.is_tracing()
+
+
+def test_memory_profiler_leaves_existing_tracing_running(tmp_path: Path) -> None:
+    """It doesn't stop tracing that was started before it."""
+    tracemalloc.start()
+    profiler = MemoryProfiler(tmp_path / "memprofile.json")
+    profiler.start()
+    profiler.stop()
+    assert tracemalloc.is_tracing()
+
+
+def test_memory_profiler_bounds_history(tmp_path: Path) -> None:
+    """It keeps only the first and most recent snapshots and diffs, counting the ones it dropped."""
+    path = tmp_path / "memprofile.json"
+    profiler = MemoryProfiler(path, limit=1, head=2, tail=2)
+    profiler.start()
+    for index in range(5):
+        profiler.snapshot(f"input {index}")
+    profiler.stop()
+
+    report = json.loads(path.read_text())
+    assert [snapshot["label"] for snapshot in report["snapshots"]] == ["start", "input 0", "input 4", "end"]
+    assert report["snapshots_dropped"] == 3
+    assert [diff["to"] for diff in report["diffs"]] == ["input 0", "input 1", "input 4", "end"]
+    assert report["diffs_dropped"] == 2
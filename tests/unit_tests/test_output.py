@@ -0,0 +1,189 @@
+"""Test cases for the output module."""
+
+import contextlib
+import io
+import os
+import sys
+import time
+from collections.abc import Iterator
+
+import pytest
+
+from robust_python_demo.output import BinaryStdoutWriter
+
+
+@pytest.fixture
+def pipe() -> Iterator[tuple[int, int]]:
+    """Fixture providing a (read, write) pipe pair that is cleaned up afterwards."""
+    read_fd, write_fd = os.pipe()
+    yield read_fd, write_fd
+    for fd in (read_fd, write_fd):
+        with contextlib.suppress(OSError):
+            os.close(fd)
+
+
+def read_available(fd: int) -> bytes:
+    """Reads whatever is currently buffered in the pipe."""
+    os.set_blocking(fd, False)
+    try:
+        return os.read(fd, 1 << 16)
+    except BlockingIOError:
+        return b""
+
+
+def read_within(fd: int, timeout: float = 5.0) -> bytes:
+    """Waits for data to arrive in the pipe, returning it or b"" once the timeout passes."""
+    deadline: float = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        data: bytes = read_available(fd)
+        if data:
+            return data
+        time.sleep(0.01)
+    return b""
+
+
+def test_write_is_buffered_until_flush(pipe: tuple[int, int]) -> None:
+    """It holds small writes in memory until flushed."""
+    read_fd, write_fd = pipe
+    writer = BinaryStdoutWriter(fd=write_fd, buffer_size=64)
+
+    writer.write(b"abc\n")
+    assert read_available(read_fd) == b""
+
+    writer.flush()
+    assert read_available(read_fd) == b"abc\n"
+
+
+def test_write_flushes_when_buffer_fills(pipe: tuple[int, int]) -> None:
+    """It writes a block once the next record would overflow the buffer."""
+    read_fd, write_fd = pipe
+    writer = BinaryStdoutWriter(fd=write_fd, buffer_size=8)
+
+    writer.write(b"12345")
+    writer.write(b"6789")
+    assert read_available(read_fd) == b"12345"
+
+    writer.close()
+    assert read_available(read_fd) == b"6789"
+
+
+def test_oversized_record_bypasses_buffer(pipe: tuple[int, int]) -> None:
+    """It writes records larger than the buffer straight through, preserving order."""
+    read_fd, write_fd = pipe
+    writer = BinaryStdoutWriter(fd=write_fd, buffer_size=4)
+
+    writer.write(b"ab")
+    writer.write(b"0123456789")
+    assert read_available(read_fd) == b"ab0123456789"
+
+
+def test_flush_interval_zero_writes_every_record(pipe: tuple[int, int]) -> None:
+    """It flushes after each write when the interval has already elapsed."""
+    read_fd, write_fd = pipe
+    writer = BinaryStdoutWriter(fd=write_fd, buffer_size=64, flush_interval=0)
+
+    writer.write(b"line\n")
+    assert read_available(read_fd) == b"line\n"
+
+
+def test_flush_interval_flushes_without_further_writes(pipe: tuple[int, int]) -> None:
+    """It writes buffered data once the interval passes even if no more records arrive."""
+    read_fd, write_fd = pipe
+    with BinaryStdoutWriter(fd=write_fd, buffer_size=64, flush_interval=0.2) as writer:
+        time.sleep(0.1)
+        writer.flush()
+        time.sleep(0.15)
+        writer.write(b"idle\n")
+        assert read_available(read_fd) == b""
+        assert read_within(read_fd) == b"idle\n"
+
+
+def test_background_broken_pipe_is_raised_on_next_write(pipe: tuple[int, int]) -> None:
+    """It keeps the error from a background flush and raises it from the next call."""
+    read_fd, write_fd = pipe
+    os.close(read_fd)
+    writer = BinaryStdoutWriter(fd=write_fd, buffer_size=64, flush_interval=0.01)
+    writer.write(b"lost\n")
+    assert writer._flusher is not None
+    writer._flusher.join(timeout=5.0)
+
+    assert writer.closed
+    with pytest.raises(BrokenPipeError):
+        writer.write(b"more")
+    with pytest.raises(BrokenPipeError):
+        writer.flush()
+    writer.close()
+
+
+def test_flusher_stops_after_broken_pipe_on_write(pipe: tuple[int, int]) -> None:
+    """It stops the background flusher once a write has closed the writer."""
+    read_fd, write_fd = pipe
+    os.close(read_fd)
+    writer = BinaryStdoutWriter(fd=write_fd, buffer_size=4, flush_interval=0.01)
+    with pytest.raises(BrokenPipeError):
+        writer.write(b"0123456789")
+
+    assert writer._flusher is not None
+    writer._flusher.join(timeout=5.0)
+    assert not writer._flusher.is_alive()
+
+
+def test_context_manager_closes_writer(pipe: tuple[int, int]) -> None:
+    """It flushes and closes on exit, leaving the descriptor open."""
+    read_fd, write_fd = pipe
+    with BinaryStdoutWriter(fd=write_fd) as writer:
+        writer.write(b"done\n")
+
+    assert writer.closed
+    assert read_available(read_fd) == b"done\n"
+    with pytest.raises(ValueError, match="closed"):
+        writer.write(b"more")
+
+
+def test_broken_pipe_redirects_to_devnull(pipe: tuple[int, int]) -> None:
+    """It raises BrokenPipeError once the reader is gone and silences the descriptor."""
+    read_fd, write_fd = pipe
+    os.close(read_fd)
+    writer = BinaryStdoutWriter(fd=write_fd, buffer_size=4)
+
+    with pytest.raises(BrokenPipeError):
+        writer.write(b"0123456789")
+
+    assert writer.closed
+    os.write(write_fd, b"ignored")
+    writer.close()
+
+
+def test_falls_back_to_stdout_buffer(monkeypatch: pytest.MonkeyPatch) -> None:
+    """It writes through sys.stdout.buffer when stdout has no file descriptor."""
+    buffer = io.BytesIO()
+    monkeypatch.setattr(sys, "stdout", io.TextIOWrapper(buffer))
+    with BinaryStdoutWriter() as writer:
+        writer.write(b"captured\n")
+
+    assert writer.fd is None
+    assert buffer.getvalue() == b"captured\n"
+
+
+def test_broken_stdout_buffer_raises(monkeypatch: pytest.MonkeyPatch) -> None:
+    """It raises BrokenPipeError from the fallback stream without touching any descriptor."""
+
+    class BrokenBuffer(io.BytesIO):
+        def write(self, _: object) -> int:
+            raise BrokenPipeError
+
+    monkeypatch.setattr(sys, "stdout", io.TextIOWrapper(BrokenBuffer()))
+    writer = BinaryStdoutWriter()
+    with pytest.raises(BrokenPipeError):
+        writer.write(b"x" * (1 << 21))
+    assert writer.closed
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "match"),
+    [({"buffer_size": 0}, "buffer_size"), ({"flush_interval": -1.0}, "flush_interval")],
+)
+def test_invalid_arguments_raise(kwargs: dict, match: str) -> None:
+    """It rejects non-positive buffer sizes and negative flush intervals."""
+    with pytest.raises(ValueError, match=match):
+        BinaryStdoutWriter(fd=1, **kwargs)
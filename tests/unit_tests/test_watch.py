@@ -0,0 +1,384 @@
+"""Test cases for the watch module."""
+
+import os
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+import platformdirs
+import pytest
+
+from robust_python_demo import watch
+from robust_python_demo.checkpoint import APP_NAME
+from robust_python_demo.exceptions import RecordFormatError
+from robust_python_demo.watch import IN_CLOSE_WRITE
+from robust_python_demo.watch import IN_ISDIR
+from robust_python_demo.watch import IN_MOVED_TO
+from robust_python_demo.watch import IN_Q_OVERFLOW
+from robust_python_demo.watch import InotifyWatcher
+from robust_python_demo.watch import Manifest
+from robust_python_demo.watch import PollingWatcher
+from robust_python_demo.watch import create_watcher
+from robust_python_demo.watch import default_manifest_dir
+from robust_python_demo.watch import list_files
+from robust_python_demo.watch import watch_directory
+
+
+linux_only = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only.")
+
+
+class FakeWatcher:
+    """Watcher returning a scripted sequence of changes."""
+
+    def __init__(self, changes: list[set[Path]]) -> None:
+        """Initializes FakeWatcher."""
+        self.changes: Iterator[set[Path]] = iter(changes)
+        self.closed: bool = False
+
+    def wait(self) -> set[Path]:
+        return next(self.changes)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def directory(tmp_path: Path) -> Path:
+    """Fixture providing an empty directory to watch."""
+    path = tmp_path / "watched"
+    path.mkdir()
+    return path
+
+
+class FakeInotify:
+    """Stands in for libc's inotify, backing the descriptor with a pipe events are written to."""
+
+    def __init__(self) -> None:
+        """Initializes FakeInotify."""
+        self.read_fd, self.write_fd = os.pipe()
+        self.pending: bool = False
+
+    def __call__(self, *_: object, **__: object) -> "FakeInotify":
+        return self
+
+    def inotify_init1(self, _: int) -> int:
+        return self.read_fd
+
+    def inotify_add_watch(self, _: int, path: bytes, __: int) -> int:
+        return 1 if Path(os.fsdecode(path)).is_dir() else -1
+
+    def send(self, *events: tuple[int, str]) -> None:
+        """Queues inotify events with the given masks and names."""
+        data = b"".join(watch._INOTIFY_EVENT.pack(1, mask, 0, len(name)) + name.encode() for mask, name in events)
+        os.write(self.write_fd, data)
+        self.pending = True
+
+    def select(self, readable: list[int], *_: object) -> tuple[list[int], list[int], list[int]]:
+        ready, self.pending = (readable if self.pending else []), False
+        return ready, [], []
+
+
+@pytest.fixture
+def fake_inotify(monkeypatch: pytest.MonkeyPatch) -> Iterator[FakeInotify]:
+    """Fixture replacing libc's inotify and select with a FakeInotify."""
+    fake = FakeInotify()
+    monkeypatch.setattr(watch.ctypes, "CDLL", fake)
+    monkeypatch.setattr(watch.select, "select", fake.select)
+    yield fake
+    os.close(fake.write_fd)
+
+
+def test_default_manifest_dir_is_in_user_state_dir() -> None:
+    """It keeps manifests under the platform's user state directory."""
+    assert default_manifest_dir().parent == platformdirs.user_state_path(APP_NAME)
+
+
+def test_list_files_skips_hidden_files_and_directories(directory: Path) -> None:
+    """It only lists regular, non-hidden files."""
+    (directory / "a.ndjson").write_text("")
+    (directory / ".partial").write_text("")
+    (directory / "nested").mkdir()
+    assert list(list_files(directory)) == [directory / "a.ndjson"]
+
+
+def test_manifest_tracks_handled_contents(directory: Path) -> None:
+    """It reports new and modified contents but not files that were only touched."""
+    path = directory / "a.ndjson"
+    path.write_text('{"n":1}\n')
+    manifest = Manifest(directory)
+
+    state = manifest.changed(path)
+    assert state is not None
+    manifest.record(path, state)
+    assert manifest.changed(path) is None
+
+    os.utime(path, ns=(0, 0))
+    assert manifest.changed(path) is None
+    assert manifest.entries[path.name].mtime_ns == 0
+
+    path.write_text('{"n":2}\n')
+    assert manifest.changed(path) is not None
+
+
+def test_manifest_persists_between_runs(directory: Path) -> None:
+    """It skips files recorded by an earlier instance for the same directory."""
+    path = directory / "a.ndjson"
+    path.write_text('{"n":1}\n')
+    first = Manifest(directory)
+    state = first.changed(path)
+    assert state is not None
+    first.record(path, state)
+    assert Manifest(directory).changed(path) is not None
+
+    first.save()
+    assert Manifest(directory).changed(path) is None
+
+
+def test_manifest_saves_once_the_save_interval_passes(directory: Path) -> None:
+    """It saves while recording once the save interval has passed since the last save."""
+    path = directory / "a.ndjson"
+    path.write_text('{"n":1}\n')
+    manifest = Manifest(directory, save_interval=0)
+    state = manifest.changed(path)
+    assert state is not None
+    manifest.record(path, state)
+
+    assert Manifest(directory).changed(path) is None
+
+
+def test_manifest_save_drops_removed_files(directory: Path) -> None:
+    """It forgets files that are no longer in the directory when saving."""
+    kept = directory / "a.ndjson"
+    removed = directory / "b.ndjson"
+    manifest = Manifest(directory)
+    for path in (kept, removed):
+        path.write_text(path.name)
+        state = manifest.changed(path)
+        assert state is not None
+        manifest.record(path, state)
+    removed.unlink()
+    manifest.save()
+
+    assert Manifest(directory).entries.keys() == {kept.name}
+
+
+def test_manifest_save_skips_writing_when_unchanged(directory: Path) -> None:
+    """It doesn't write the manifest when nothing was recorded since the last save."""
+    manifest = Manifest(directory)
+    manifest.save()
+    assert not manifest.path.exists()
+
+
+@pytest.mark.parametrize("content", ["{broken", '{"version": 99, "files": {}}', '{"version": 1, "files": {"a": {}}}'])
+def test_manifest_ignores_unreadable_manifest(directory: Path, content: str) -> None:
+    """It starts over when the saved manifest can't be used."""
+    manifest = Manifest(directory)
+    manifest.path.parent.mkdir(parents=True)
+    manifest.path.write_text(content)
+    assert Manifest(directory).entries == {}
+
+
+def test_polling_watcher_waits_for_files_to_settle(directory: Path) -> None:
+    """It reports a file once it has stayed the same for a full poll interval."""
+    watcher = PollingWatcher(directory, interval=0)
+    path = directory / "a.ndjson"
+    path.write_text("partial")
+    assert watcher.wait() == set()
+    assert watcher.wait() == {path}
+    assert watcher.wait() == set()
+
+    path.write_text("changed again")
+    (directory / "b.ndjson").write_text("")
+    assert watcher.wait() == set()
+    (directory / "b.ndjson").unlink()
+    assert watcher.wait() == {path}
+    watcher.close()
+
+
+def test_polling_watcher_tolerates_files_vanishing(directory: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """It skips files that disappear between listing and stat."""
+    path = directory / "a.ndjson"
+    path.write_text("")
+    monkeypatch.setattr(watch, "list_files", lambda _: iter([path, directory / "gone"]))
+    assert PollingWatcher(directory, interval=0)._snapshot.keys() == {path}
+
+
+@linux_only
+def test_inotify_watcher_reports_written_and_moved_files(directory: Path) -> None:  # pragma: no cover - Linux only
+    """It reports files closed after writing or moved in, but not hidden ones."""
+    inotify = InotifyWatcher(directory, timeout=0)
+    assert inotify.wait() == set()
+
+    (directory / "a.ndjson").write_text("")
+    (directory / ".b.tmp").write_text("")
+    (directory / ".b.tmp").rename(directory / "b.ndjson")
+    assert inotify.wait() == {directory / "a.ndjson", directory / "b.ndjson"}
+    inotify.close()
+
+
+def test_parse_events_skips_hidden_and_unnamed_events() -> None:
+    """It returns the names of non-hidden files, dropping the padding after each name."""
+    data = b"".join(
+        watch._INOTIFY_EVENT.pack(1, IN_CLOSE_WRITE, 0, len(name)) + name
+        for name in [b"a.ndjson\0\0\0\0", b".b.tmp\0\0", b"", "é.ndjson".encode()]
+    )
+    assert watch._parse_events(data) == ({"a.ndjson", "é.ndjson"}, False)
+
+
+def test_parse_events_reports_overflow() -> None:
+    """It reports when the kernel's event queue overflowed."""
+    data = (
+        watch._INOTIFY_EVENT.pack(1, IN_CLOSE_WRITE, 0, 4)
+        + b"a\0\0\0"
+        + watch._INOTIFY_EVENT.pack(-1, IN_Q_OVERFLOW, 0, 0)
+    )
+    assert watch._parse_events(data) == (set(), True)
+
+
+def test_inotify_watcher_reports_files_from_events(directory: Path, fake_inotify: FakeInotify) -> None:
+    """It turns events into paths in the directory, returning nothing when the wait times out."""
+    watcher = InotifyWatcher(directory, timeout=0)
+    assert watcher.wait() == set()
+
+    fake_inotify.send((IN_CLOSE_WRITE, "a.ndjson"), (IN_MOVED_TO, "b.ndjson"))
+    assert watcher.wait() == {directory / "a.ndjson", directory / "b.ndjson"}
+    watcher.close()
+
+
+def test_inotify_watcher_ignores_directory_events(directory: Path, fake_inotify: FakeInotify) -> None:
+    """It skips directories created in or moved into the directory."""
+    (directory / "sub").mkdir()
+    watcher = InotifyWatcher(directory, timeout=0)
+    fake_inotify.send((IN_MOVED_TO | IN_ISDIR, "sub"), (IN_CLOSE_WRITE, "a.ndjson"))
+    assert watcher.wait() == {directory / "a.ndjson"}
+    watcher.close()
+
+
+def test_inotify_watcher_rescans_on_overflow(directory: Path, fake_inotify: FakeInotify) -> None:
+    """It reports every file when the kernel's event queue overflowed."""
+    (directory / "a.ndjson").write_text("")
+    watcher = InotifyWatcher(directory, timeout=0)
+    fake_inotify.send((IN_Q_OVERFLOW, ""))
+    assert watcher.wait() == {directory / "a.ndjson"}
+    watcher.close()
+
+
+def test_inotify_watcher_rejects_missing_directory(directory: Path, fake_inotify: FakeInotify) -> None:
+    """It raises OSError and closes the descriptor when the watch can't be added."""
+    with pytest.raises(OSError, match="inotify_add_watch"):
+        InotifyWatcher(directory / "missing")
+    with pytest.raises(OSError, match="Bad file descriptor"):
+        os.fstat(fake_inotify.read_fd)
+
+
+def test_inotify_watcher_unavailable(directory: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """It raises OSError where libc has no inotify."""
+
+    class NoInotify:
+        def __init__(self, *_: object, **__: object) -> None:
+            pass
+
+    monkeypatch.setattr(watch.ctypes, "CDLL", NoInotify)
+    with pytest.raises(OSError, match="not available"):
+        InotifyWatcher(directory)
+
+
+def test_inotify_watcher_init_failure(directory: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """It raises OSError when inotify_init1 fails."""
+
+    class FailingInotify:
+        def __init__(self, *_: object, **__: object) -> None:
+            self.inotify_init1 = lambda _: -1
+            self.inotify_add_watch = lambda *_: -1
+
+    monkeypatch.setattr(watch.ctypes, "CDLL", FailingInotify)
+    with pytest.raises(OSError, match="inotify_init1"):
+        InotifyWatcher(directory)
+
+
+def test_create_watcher_falls_back_to_polling(directory: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """It polls when inotify can't be used."""
+
+    def unavailable(*_: object, **__: object) -> None:
+        raise OSError("unavailable")
+
+    monkeypatch.setattr(watch, "InotifyWatcher", unavailable)
+    watcher = create_watcher(directory, poll_interval=0)
+    assert isinstance(watcher, PollingWatcher)
+
+
+def test_watch_directory_handles_each_change_once(directory: Path) -> None:
+    """It handles existing files, then changed ones, skipping anything already handled."""
+    first = directory / "a.ndjson"
+    second = directory / "b.ndjson"
+    first.write_text("1")
+    handled: list[Path] = []
+    watcher = FakeWatcher([{first}, {first, second}])
+
+    def handle(path: Path) -> None:
+        handled.append(path)
+        if path == first:
+            second.write_text("2")
+
+    waits = iter([False, False, True])
+    watch_directory(directory, handle, watcher=watcher, stop=lambda: next(waits))
+
+    assert handled == [first, second]
+    assert watcher.closed
+
+
+def test_watch_directory_records_failed_files(directory: Path) -> None:
+    """It logs files that fail to decode and doesn't retry them until they change."""
+    path = directory / "a.ndjson"
+    path.write_text("broken")
+    handled: list[Path] = []
+
+    def handle(path: Path) -> None:
+        handled.append(path)
+        raise RecordFormatError("ndjson", "broken")
+
+    watch_directory(directory, handle, watcher=FakeWatcher([{path}]), stop=iter([False, True]).__next__)
+    assert handled == [path]
+
+
+def test_watch_directory_skips_vanished_files(directory: Path) -> None:
+    """It ignores files that were removed before they could be handled."""
+    handled: list[Path] = []
+    watcher = FakeWatcher([{directory / "gone"}])
+    watch_directory(directory, handled.append, watcher=watcher, stop=iter([False, True]).__next__)
+    assert handled == []
+
+
+def test_watch_directory_skips_directories(directory: Path) -> None:
+    """It logs and skips paths that turn out to be directories."""
+    (directory / "sub").mkdir()
+    handled: list[Path] = []
+    watcher = FakeWatcher([{directory / "sub"}])
+    watch_directory(directory, handled.append, watcher=watcher, stop=iter([False, True]).__next__)
+    assert handled == []
+
+
+def test_watch_directory_retries_files_that_vanish_while_handled(directory: Path) -> None:
+    """It skips files that can't be opened once hashed, without recording them, and keeps watching."""
+    path = directory / "a.ndjson"
+    path.write_text("1")
+    handled: list[Path] = []
+
+    def handle(path: Path) -> None:
+        handled.append(path)
+        if len(handled) == 1:
+            raise FileNotFoundError(path)
+
+    watch_directory(directory, handle, watcher=FakeWatcher([{path}]), stop=iter([False, True]).__next__)
+    assert handled == [path, path]
+
+
+def test_watch_directory_stops_on_broken_pipe(directory: Path) -> None:
+    """It lets a broken output pipe end the watch rather than skipping the file."""
+    (directory / "a.ndjson").write_text("1")
+
+    def handle(_: Path) -> None:
+        raise BrokenPipeError
+
+    with pytest.raises(BrokenPipeError):
+        watch_directory(directory, handle, watcher=FakeWatcher([]))